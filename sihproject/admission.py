@@ -0,0 +1,63 @@
+import threading
+from contextlib import contextmanager
+
+# -------------------- Admission Control --------------------
+# Bounds how many requests run an expensive section at once. Up to
+# `max_concurrent` run; up to `max_queue` more wait (at most `queue_timeout`
+# seconds) for a slot; anything beyond that is turned away immediately, so an
+# overload costs the extra requests a fast rejection instead of slowing down
+# every request in the process.
+class AdmissionController:
+    def __init__(self, max_concurrent, max_queue, queue_timeout):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+        self.counters = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_timeout": 0}
+
+    def count(self, name):
+        # Callers record what they did with rejected requests (e.g. "degraded").
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    def _acquire(self):
+        if self.slots.acquire(blocking=False):
+            return True
+        with self.lock:
+            if self.waiting >= self.max_queue:
+                self.counters["rejected_queue_full"] += 1
+                return False
+            self.waiting += 1
+            self.counters["queued"] += 1
+        try:
+            acquired = self.slots.acquire(timeout=self.queue_timeout)
+        finally:
+            with self.lock:
+                self.waiting -= 1
+        if not acquired:
+            self.count("rejected_timeout")
+        return acquired
+
+    @contextmanager
+    def admit(self):
+        # Yields True when the caller got a slot and should do the work, or
+        # False when it was rejected and should shed or degrade instead.
+        if not self._acquire():
+            yield False
+            return
+        with self.lock:
+            self.in_flight += 1
+            self.counters["admitted"] += 1
+        try:
+            yield True
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+            self.slots.release()
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.counters, in_flight=self.in_flight, waiting=self.waiting)
@@ -1,15 +1,34 @@
-import joblib
-import pandas as pd
-from flask import Flask, render_template, request, redirect, url_for, session, flash
+import time
+app_started_at = time.perf_counter()
+
+from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
 from functools import wraps
-from sklearn.feature_extraction.text import TfidfVectorizer
-import ast
-import random
+from contextlib import contextmanager
+import os
+import threading
+from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
+from jinja2 import FileSystemBytecodeCache
 from werkzeug.security import generate_password_hash, check_password_hash
+from percolator import PreferenceIndex
+from assets import init_assets
+from admission import AdmissionController
+from catalogue import build_text_features, dedupe, fit_vectorizers, load_model, load_postings, prepare_changes, version_stamp
+from model_client import MAX_K, ModelClient, ModelServerError
+from precompute import STORED_N, TOP_N, preference_text, preferences_fingerprint
+from seen import SeenPostings
 
 app = Flask(__name__)
 app.secret_key = "secret123"
+init_assets(app)
+
+# -------------------- Template Cache --------------------
+# Compiled templates are written to disk, so a fresh worker loads bytecode
+# instead of recompiling every template. Entries are keyed by the template's
+# source checksum, so edited templates are recompiled automatically.
+TEMPLATE_CACHE_DIR = os.path.join(app.instance_path, "jinja_cache")
+os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
 
 # -------------------- Database Configuration --------------------
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///users.db'
@@ -30,14 +49,15 @@ class User(db.Model):
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
 
+# Only the posting id is stored; title, stipend etc. are read from the
+# catalogue when the shortlist is shown. Older databases are converted by
+# migrate_shortlist.py.
 class ShortlistedInternship(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    title = db.Column(db.String(255), nullable=False)
-    sector = db.Column(db.String(100), nullable=True)
-    location = db.Column(db.String(100), nullable=True)
-    duration = db.Column(db.String(50), nullable=True)
-    stipend = db.Column(db.String(50), nullable=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    internship_id = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    __table_args__ = (db.UniqueConstraint('user_id', 'internship_id'),)
 
 class UserPreferences(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -46,6 +66,71 @@ class UserPreferences(db.Model):
     sector = db.Column(db.String(100))
     location = db.Column(db.String(100))
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), unique=True)
+    # Set by next_preferences_seq() on every save; the percolator reads changes past it.
+    change_seq = db.Column(db.Integer, index=True)
+
+def next_preferences_seq():
+    # Evaluated inside the INSERT/UPDATE, under SQLite's write lock, so numbers
+    # are handed out in commit order across all workers and a reader polling
+    # past the highest one it has seen never skips a save.
+    saved = db.aliased(UserPreferences)
+    return db.select(db.func.coalesce(db.func.max(saved.change_seq), 0) + 1).scalar_subquery()
+
+# Outbox of new postings that match a user's saved preferences. A notifier
+# drains it by reading rows with no delivered_at and stamping them once sent.
+class MatchEvent(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    internship_id = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    delivered_at = db.Column(db.DateTime, nullable=True, index=True)
+    __table_args__ = (db.UniqueConstraint('user_id', 'internship_id'),)
+
+# Top-N posting ids per user, written by `flask --app app precompute-recommendations`.
+# A row is only served while the user's preferences and the catalogue version
+# still match the ones it was scored against.
+class PrecomputedRecommendation(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), unique=True, nullable=False)
+    internship_ids = db.Column(db.Text, nullable=False)  # comma-separated, best first, up to STORED_N
+    predicted_sector = db.Column(db.String(100), nullable=False)
+    preferences_hash = db.Column(db.String(40), nullable=False)
+    catalogue_version = db.Column(db.String(16), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+# Compressed bitmap of the posting ids a user has swiped on (see seen.py), so
+# a new search never deals them the same cards again.
+class UserSeenPostings(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), unique=True, nullable=False)
+    bitmap = db.Column(db.LargeBinary, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+def init_db():
+    # Run at start-up however the app is launched (`python app.py`, `flask
+    # run`, a WSGI server), so tables added since users.db was created exist
+    # before the first request or background job touches them.
+    from sqlalchemy.exc import OperationalError
+
+    try:
+        db.create_all()
+    except OperationalError:
+        db.create_all()  # another worker created a table first; the rest are still missing
+    inspector = db.inspect(db.engine)
+    if "change_seq" not in {column["name"] for column in inspector.get_columns("user_preferences")}:
+        try:
+            db.session.execute(db.text("ALTER TABLE user_preferences ADD COLUMN change_seq INTEGER"))
+            db.session.execute(db.text("UPDATE user_preferences SET change_seq = id"))
+            db.session.execute(db.text("CREATE INDEX ix_user_preferences_change_seq ON user_preferences (change_seq)"))
+            db.session.commit()
+        except OperationalError:
+            db.session.rollback()  # added by another worker
+    # Shortlists saved in the old format (copied posting fields, no id) are
+    # converted once; see migrate_shortlist.py.
+    columns = {column["name"] for column in inspector.get_columns("shortlisted_internship")}
+    if "internship_id" not in columns:
+        from migrate_shortlist import migrate
+        migrate(db.engine.url.database)
 
 # -------------------- Language Configuration --------------------
 LANGUAGES = {
@@ -167,32 +252,370 @@ LANGUAGES = {
 AVAILABLE_LANGS = [{'code': 'en', 'name': 'English'}, {'code': 'hi', 'name': 'Hindi'}, {'code': 'mr', 'name': 'Marathi'}]
 
 # -------------------- Load Data and Model --------------------
-try:
-    model = joblib.load("internshipmodel.pkl")
-except FileNotFoundError:
-    model = None
-    print("⚠️ internshipmodel.pkl not found. Predictions won't work.")
-
-try:
-    df = pd.read_csv("internships.csv")
-    df['required_skills'] = df['required_skills'].apply(lambda x: ast.literal_eval(x) if isinstance(x, str) else [])
-except FileNotFoundError:
-    df = pd.DataFrame()
-    print("⚠️ internships.csv not found. No internships will be available.")
-
-# -------------------- Vectorizer Setup --------------------
-if not df.empty:
-    df["text_features"] = (
-        df["title"].astype(str) + " " +
-        df["sector"].astype(str) + " " +
-        df["required_skills"].astype(str) + " " +
-        df["education_required"].astype(str) + " " +
-        df["location"].astype(str)
+# pandas, scikit-learn and the model are only needed once someone asks for
+# recommendations, so they are imported and loaded off the request path.
+# Login, registration and the static pages are served in the meantime.
+#   WARMUP_MODE=background (default): load in a thread as soon as the app starts
+#   WARMUP_MODE=lazy: load when the first request needs the catalogue
+#   WARMUP_MODE=eager: load before the app finishes importing
+WARMUP_MODE = os.environ.get("WARMUP_MODE", "background")
+CATALOGUE_WAIT_SECONDS = 20
+
+# With MODEL_SERVER_SOCKET set, predictions come from model_server.py, which
+# holds the only copy of the model and retrieval index for all workers.
+model_client = ModelClient.from_env()
+
+model = None
+df = None
+vectorizer = None
+search_index = None
+expiry_index = None
+listing_index = None
+catalogue_version = None
+catalogue_ready = threading.Event()
+warmup_lock = threading.Lock()
+warmup_started = False
+warmup_error = None
+startup_timings = []
+
+@contextmanager
+def timed(stage):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_timings.append((stage, time.perf_counter() - started))
+
+def load_catalogue():
+    global model, df, vectorizer, search_index, expiry_index, listing_index, catalogue_version
+    # With a model server the catalogue is still needed here (cards, listings,
+    # filters) but the model, the vectorizers and the retrieval index are not,
+    # so scikit-learn is never imported.
+    remote = model_client is not None
+    with timed("imports"):
+        import pandas  # noqa: F401  (timed here, not in the first stage that uses it)
+        from expiry import ExpiryIndex
+        from listing_index import ListingIndex
+        if not remote:
+            from search_index import TfidfIndex
+
+    with timed("model"):
+        compiled_vectorizer, loaded_model = (None, None) if remote else load_model()
+
+    with timed("catalogue"):
+        frame, catalogue_seq = load_postings()
+
+    with timed("dedup"):
+        frame = dedupe(frame)
+        if not frame.empty:
+            frame["text_features"] = build_text_features(frame)
+
+    with timed("vectorizer"):
+        if not frame.empty and not remote:
+            model_vectorizer, index_vectorizer = fit_vectorizers(frame, compiled_vectorizer)
+        else:
+            model_vectorizer = None
+
+    with timed("indexes"):
+        if not frame.empty:
+            if not remote:
+                search_index = TfidfIndex(index_vectorizer, frame["text_features"], frame["internship_id"])
+            expiry_index = ExpiryIndex(frame["internship_id"], frame["deadline"], frame["sector"])
+        # Built once; later catalogue changes are applied with ListingIndex.updated().
+        listing_index = ListingIndex(frame)
+
+    model, vectorizer, df = loaded_model, model_vectorizer, frame
+    catalogue_version = version_stamp(catalogue_seq)
+
+    if expiry_index is not None and catalogue_seq is not None:
+        threading.Thread(target=watch_posting_store, args=(catalogue_seq,), daemon=True).start()
+    if expiry_index is not None:
+        threading.Thread(target=prune_expired_postings, daemon=True).start()
+        threading.Thread(target=refresh_popular_postings, daemon=True).start()
+
+def warm_up():
+    global warmup_error
+    started = time.perf_counter()
+    try:
+        load_catalogue()
+    except Exception as e:
+        warmup_error = f"{type(e).__name__}: {e}"
+        print(f"⚠️ Warm-up failed: {warmup_error}")
+    finally:
+        catalogue_ready.set()
+    stages = ", ".join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in startup_timings)
+    print(f"🔥 Warm-up finished in {(time.perf_counter() - started) * 1000:.0f} ms ({stages})")
+
+def start_warmup(background=True):
+    global warmup_started
+    with warmup_lock:
+        if warmup_started:
+            return
+        warmup_started = True
+    if background:
+        threading.Thread(target=warm_up, daemon=True).start()
+    else:
+        warm_up()
+
+def catalogue_required(f):
+    # Waits (briefly) for the warm-up instead of failing the first requests
+    # after a restart; if it is still running, the client is asked to retry.
+    # If it failed, retrying won't help until the app is fixed and restarted,
+    # so the catalogue is reported as unavailable instead.
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        start_warmup()
+        if not catalogue_ready.wait(CATALOGUE_WAIT_SECONDS):
+            message = "Recommendations are still loading. Please try again in a moment."
+            if request.path.startswith("/api/"):
+                return jsonify({"error": message}), 503, {"Retry-After": "5"}
+            flash(message, "info")
+            return redirect(url_for("home"))
+        if df is None:
+            message = "Recommendations are unavailable right now."
+            if request.path.startswith("/api/"):
+                return jsonify({"error": message}), 503
+            flash(message, "error")
+            return redirect(url_for("home"))
+        return f(*args, **kwargs)
+    return decorated_function
+
+# -------------------- Catalogue Updates --------------------
+# New and changed postings from the ingestion pipeline are applied to the
+# running catalogue and index without re-reading everything.
+CATALOGUE_POLL_SECONDS = 30
+EXPIRY_PRUNE_SECONDS = 3600
+catalogue_lock = threading.Lock()
+
+def apply_catalogue_changes(changes):
+    import pandas as pd
+
+    global df, catalogue_version
+    known_ids = set(df["internship_id"])
+    change_seq = int(changes["change_seq"].max())
+    live, changes = prepare_changes(changes)
+
+    if search_index is not None:
+        search_index.delete(changes.loc[~changes.index.isin(live.index), "internship_id"])
+        search_index.add(live["internship_id"], live["text_features"])
+    expiry_index.remove(changes["internship_id"])
+    expiry_index.add(live["internship_id"], live["deadline"], live["sector"])
+    global listing_index
+    with catalogue_lock:
+        df = pd.concat([df[~df["internship_id"].isin(changes["internship_id"])], live[df.columns]], ignore_index=True)
+        listing_index = listing_index.updated(changes["internship_id"], live[df.columns])
+    # Precomputed lists scored against the old catalogue stop being served.
+    catalogue_version = version_stamp(change_seq)
+    print(f"🔄 Catalogue updated: {len(live)} added/changed, {len(changes) - len(live)} removed")
+
+    new_postings = live[~live["internship_id"].isin(known_ids)]
+    if not new_postings.empty:
+        # The catalogue is already updated, so a failure here only costs these alerts.
+        try:
+            with app.app_context():
+                queue_match_events(new_postings.to_dict('records'))
+        except Exception as e:
+            print(f"⚠️ Alerts for {len(new_postings)} new postings failed: {type(e).__name__}: {e}")
+
+def watch_posting_store(last_seen):
+    from posting_store import POSTINGS_DB, PostingStore
+
+    # Errors are logged and the same changes retried on the next poll; the
+    # thread must outlive them or the catalogue would silently stop updating.
+    while True:
+        time.sleep(CATALOGUE_POLL_SECONDS)
+        try:
+            store = PostingStore(POSTINGS_DB)
+            try:
+                changes = store.changes_since(last_seen)
+            finally:
+                store.close()
+            if not changes.empty:
+                apply_catalogue_changes(changes)
+                last_seen = int(changes["change_seq"].max())
+        except Exception as e:
+            print(f"⚠️ Catalogue update failed, retrying in {CATALOGUE_POLL_SECONDS}s: {type(e).__name__}: {e}")
+
+# Expired postings are already skipped by the expiry index; this just evicts
+# them from the catalogue and retrieval index so they stop taking up space.
+def prune_expired_postings():
+    global df, listing_index
+    while True:
+        expired = expiry_index.prune()
+        if len(expired):
+            if search_index is not None:
+                search_index.delete(expired)
+            with catalogue_lock:
+                df = df[~df["internship_id"].isin(expired)].reset_index(drop=True)
+                listing_index = listing_index.updated(expired)
+            print(f"⌛ Pruned {len(expired)} expired postings")
+        time.sleep(EXPIRY_PRUNE_SECONDS)
+
+# -------------------- New-Posting Alerts --------------------
+# Saved preferences are indexed so each new posting is matched by index
+# lookups, not a scan. Every worker keeps its own index and, before each batch,
+# applies the preferences saved since its last batch (by any worker), found
+# through their change_seq. Preferences are only ever overwritten, never
+# deleted, so re-adding a changed row is all the refresh has to do.
+preference_index = PreferenceIndex()
+preference_seq = 0
+
+def refresh_preference_index():
+    global preference_seq
+    changed = (UserPreferences.query.filter(UserPreferences.change_seq > preference_seq)
+               .order_by(UserPreferences.change_seq).all())
+    for prefs in changed:
+        preference_index.add_user(prefs.user_id, prefs.education, prefs.skills, prefs.sector, prefs.location)
+    if changed:
+        preference_seq = changed[-1].change_seq
+
+def queue_match_events(postings):
+    started = time.perf_counter()
+    refresh_preference_index()
+    matches = preference_index.match_batch(postings)
+    if matches:
+        now = datetime.utcnow()
+        db.session.execute(
+            db.insert(MatchEvent).prefix_with("OR IGNORE"),
+            [{'user_id': user_id, 'internship_id': int(internship_id), 'created_at': now} for user_id, internship_id in matches],
+        )
+        db.session.commit()
+    print(f"🔔 {len(postings)} new postings matched {len(matches)} user alerts in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+# -------------------- Admission Control --------------------
+# Each /predict POST vectorises and runs the model. Under a spike only
+# PREDICT_CONCURRENCY of them run at once and a bounded queue waits behind
+# them; the rest are turned away at once instead of slowing every request
+# down. Those get popular postings for their chosen sector (no model
+# involved), or a 503 with Retry-After when there is nothing to show.
+PREDICT_CONCURRENCY = max(2, os.cpu_count() or 1)
+PREDICT_QUEUE_SIZE = 16
+PREDICT_QUEUE_TIMEOUT = 2.0
+RETRY_AFTER_SECONDS = 5
+POPULAR_PER_SECTOR = 20
+POPULAR_REFRESH_SECONDS = 300
+
+predict_admission = AdmissionController(PREDICT_CONCURRENCY, PREDICT_QUEUE_SIZE, PREDICT_QUEUE_TIMEOUT)
+popular_by_sector = {}
+
+def compute_popular_postings():
+    # Live postings in each sector (and overall, under None), most saved first,
+    # then by stipend.
+    saves = dict(
+        db.session.query(ShortlistedInternship.internship_id, db.func.count())
+        .group_by(ShortlistedInternship.internship_id)
     )
-    vectorizer = TfidfVectorizer(stop_words="english", max_features=1000)
-    vectorizer.fit(df["text_features"])
-else:
-    vectorizer = None
+    records = listing_index.records
+    popular = {}
+    for sector in [None] + sorted({rec["sector"] for rec in records.values()}):
+        ids = [int(i) for i in expiry_index.live_ids(sector) if int(i) in records]
+        ids.sort(key=lambda i: (-saves.get(i, 0), -records[i]["stipend"]))
+        popular[sector] = ids[:POPULAR_PER_SECTOR]
+    return popular
+
+def refresh_popular_postings():
+    global popular_by_sector
+    while True:
+        # On failure the previous lists stay in use until the next refresh.
+        try:
+            with app.app_context():
+                popular_by_sector = compute_popular_postings()
+        except Exception as e:
+            print(f"⚠️ Popular postings refresh failed: {type(e).__name__}: {e}")
+        # Retried soon while there is nothing at all to fall back on.
+        time.sleep(POPULAR_REFRESH_SECONDS if popular_by_sector else RETRY_AFTER_SECONDS)
+
+def popular_postings(sector, location, limit, seen=None):
+    ids = popular_by_sector.get(sector) or popular_by_sector.get(None, [])
+    if seen is not None:
+        ids = seen.unseen(ids).tolist()
+    records = listing_index.records
+    # Postings in the user's preferred location first; the sort is stable.
+    ids = sorted((i for i in ids if i in records), key=lambda i: records[i]["location"] != location)
+    return ids[:limit]
+
+# -------------------- Seen Postings --------------------
+# The bitmap is read from the database once per login and kept in the session
+# cookie after that. The session copy also takes in every card as it is dealt
+# (see pop_recommendations), so it covers this session's swipes without the
+# swipe API having to rewrite the cookie; a swipe response that overtook a
+# card fetch would otherwise restore a stale queue. Swipes merge into the
+# stored row, so swipes from another device are never lost. Bitmaps too big
+# for a cookie are re-read instead.
+SEEN_SESSION_MAX_BYTES = 2048
+
+def load_seen(user_id):
+    data = session.get("seen")
+    if data is None:
+        row = UserSeenPostings.query.filter_by(user_id=user_id).first()
+        data = row.bitmap if row else b""
+        if len(data) <= SEEN_SESSION_MAX_BYTES:
+            session["seen"] = data
+    return SeenPostings.from_bytes(data)
+
+def cache_seen(seen):
+    data = seen.to_bytes()
+    if len(data) <= SEEN_SESSION_MAX_BYTES:
+        session["seen"] = data
+    else:
+        session.pop("seen", None)
+
+def mark_seen(user_id, ids):
+    # Only real postings are recorded; ids come from the client.
+    records = listing_index.records
+    ids = [i for i in ids if i in records]
+    if not ids:
+        return
+    row = UserSeenPostings.query.filter_by(user_id=user_id).first()
+    seen = SeenPostings.from_bytes(row.bitmap if row else b"")
+    seen.add(ids)
+    data = seen.to_bytes()
+    if row:
+        row.bitmap, row.updated_at = data, datetime.utcnow()
+    else:
+        db.session.add(UserSeenPostings(user_id=user_id, bitmap=data))
+    db.session.commit()
+
+# -------------------- Precomputed Recommendations --------------------
+def precomputed_recommendations(user_id, education, skills, sector, location, seen):
+    # The first TOP_N unseen, still-live ids of the user's precomputed list, or
+    # None when there is no list for these preferences and this catalogue
+    # version. Dropping postings from a ranked list keeps the rest in order, so
+    # this is what live scoring returns, unless the list was cut off at
+    # STORED_N and fewer than TOP_N are left; then live scoring is needed.
+    import numpy as np
+
+    row = PrecomputedRecommendation.query.filter_by(user_id=user_id).first()
+    if (row is None or catalogue_version is None or row.catalogue_version != catalogue_version
+            or row.preferences_hash != preferences_fingerprint(education, skills, sector, location)):
+        return None
+    stored = np.array([int(i) for i in row.internship_ids.split(",") if i], dtype=np.int64)
+    ids = stored[np.isin(stored, expiry_index.live_ids(row.predicted_sector)) & ~seen.mask(stored)]
+    ids = [i for i in ids.tolist() if i in listing_index.records]
+    if len(ids) < TOP_N and len(stored) >= STORED_N:
+        return None
+    return ids[:TOP_N]
+
+@app.route("/metrics")
+def metrics():
+    stats = predict_admission.snapshot()
+    lines = []
+    for name, kind, help_text, value in [
+        ("predict_admitted_total", "counter", "Predict requests that ran the model.", stats["admitted"]),
+        ("predict_queued_total", "counter", "Predict requests that waited for a slot.", stats["queued"]),
+        ("predict_rejected_total{reason=\"queue_full\"}", "counter", "Predict requests turned away.", stats["rejected_queue_full"]),
+        ("predict_rejected_total{reason=\"timeout\"}", "counter", None, stats["rejected_timeout"]),
+        ("predict_degraded_total", "counter", "Rejected requests served popular postings instead.", stats.get("degraded", 0)),
+        ("predict_shed_total", "counter", "Rejected requests answered with 503.", stats.get("shed", 0)),
+        ("predict_precomputed_total", "counter", "Predict requests served a precomputed list.", stats.get("precomputed", 0)),
+        ("predict_in_flight", "gauge", "Predict requests running the model now.", stats["in_flight"]),
+        ("predict_queue_depth", "gauge", "Predict requests waiting for a slot now.", stats["waiting"]),
+    ]:
+        metric = name.split("{")[0]
+        if help_text:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+        lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n", 200, {"Content-Type": "text/plain; version=0.0.4"}
 
 # -------------------- Decorator for Auth --------------------
 def login_required(f):
@@ -254,6 +677,7 @@ def do_login():
     
     if user and user.check_password(password):
         session['username'] = username
+        session.pop("seen", None)  # reloaded for this user on first use
         flash(f"{LANGUAGES[session.get('lang', 'en')]['welcome_message']} to the PM Internship Scheme!", "success")
         return redirect(url_for("home"))
     else:
@@ -280,16 +704,26 @@ def dashboard():
     # Get the count of saved internships for the user
     shortlist_count = ShortlistedInternship.query.filter_by(user_id=user.id).count()
 
+    # The dashboard never waits for the warm-up or runs the model; it only
+    # shows a precomputed list that is still current.
+    recommended = []
+    if preferences and catalogue_ready.is_set() and df is not None:
+        ids = precomputed_recommendations(user.id, preferences.education, preferences.skills,
+                                          preferences.sector, preferences.location, load_seen(user.id))
+        recommended = lookup_postings(ids or [])
+
     return render_template("dashboard.html", 
                            user=user, 
                            preferences=preferences, 
-                           shortlist_count=shortlist_count)
+                           shortlist_count=shortlist_count,
+                           recommended=recommended)
 
 @app.route("/predict", methods=["GET", "POST"])
 @login_required
+@catalogue_required
 def predict():
     if request.method == "POST":
-        if model is None or df.empty or vectorizer is None:
+        if df.empty or (model_client is None and (model is None or vectorizer is None or search_index is None)):
             flash("Model or data not loaded. Cannot make recommendations.", "error")
             return redirect(url_for("home"))
 
@@ -307,35 +741,64 @@ def predict():
                 preferences.skills = skills
                 preferences.sector = sector_interest
                 preferences.location = location_interest
+                preferences.change_seq = next_preferences_seq()
             else:
                 new_preferences = UserPreferences(
                     education=education,
                     skills=skills,
                     sector=sector_interest,
                     location=location_interest,
-                    user=user
+                    user=user,
+                    change_seq=next_preferences_seq(),
                 )
                 db.session.add(new_preferences)
             
             db.session.commit()
             
-            user_input_text = f"{sector_interest} {skills} {education} {location_interest}"
+            user_input_text = preference_text(education, skills, sector_interest, location_interest)
             
-            X_user = vectorizer.transform([user_input_text])
-            predicted_sector = model.predict(X_user)[0]
-            
-            recommended_internships = df[df["sector"] == predicted_sector].to_dict('records')
-            
-            random.shuffle(recommended_internships)
-            recommendations_to_show = recommended_internships[:5]
+            # Served straight from the batch job's store when it is still current;
+            # only changed preferences or a new catalogue need the model.
+            # Postings the user has already swiped on are never dealt again.
+            seen = load_seen(user.id)
+            top_ids = precomputed_recommendations(user.id, education, skills, sector_interest, location_interest, seen)
+            admitted = True
+            if top_ids is not None:
+                predict_admission.count("precomputed")
+            else:
+                with predict_admission.admit() as admitted:
+                    if admitted and model_client is not None:
+                        try:
+                            # Over-fetched so TOP_N are left once seen postings are dropped.
+                            predicted_sector, top_ids = model_client.top_k(user_input_text, k=min(TOP_N + len(seen), MAX_K))
+                            top_ids = seen.unseen(top_ids)[:TOP_N].tolist()
+                        except ModelServerError as e:
+                            # Handled like overload: popular postings rather than an error page.
+                            print(f"⚠️ {e}")
+                            admitted = False
+                    elif admitted:
+                        X_user = vectorizer.transform([user_input_text])
+                        predicted_sector = model.predict(X_user)[0]
+                        
+                        # Rank the predicted sector's postings by similarity to what the user typed.
+                        sector_ids = seen.unseen(expiry_index.live_ids(predicted_sector))
+                        top_ids = search_index.rank(user_input_text, sector_ids, limit=TOP_N)
             
-            session["recommendations"] = recommendations_to_show
-            session.modified = True
+            if not admitted:
+                top_ids = popular_postings(sector_interest, location_interest, limit=TOP_N, seen=seen)
+                if not top_ids:
+                    predict_admission.count("shed")
+                    flash("We're handling a lot of requests right now. Please try again in a few seconds.", "error")
+                    return render_template("home.html"), 503, {"Retry-After": str(RETRY_AFTER_SECONDS)}
+                predict_admission.count("degraded")
+                flash("We're handling a lot of requests right now, so here are popular internships instead.", "info")
             
-            current_rec = session["recommendations"].pop(0) if session["recommendations"] else None
-            session.modified = True
+            # Only ids are queued in the session; cards are resolved from the
+            # catalogue as they are served.
+            session["recommendations"] = top_ids
+            current_rec = pop_recommendations(1, user.id)
             
-            return render_template("recommendations.html", recommendation=current_rec)
+            return render_template("recommendations.html", recommendation=current_rec[0] if current_rec else None, swipe_api=True)
 
         except Exception as e:
             flash(f"An error occurred: {e}", "error")
@@ -356,70 +819,277 @@ def predict():
 
 @app.route("/next_recommendation", methods=["POST"])
 @login_required
+@catalogue_required
 def next_recommendation():
     action = request.form.get('action')
+    user = User.query.filter_by(username=session['username']).first()
+    internship_id = request.form.get('internship_id', type=int)
+    if internship_id is not None:
+        mark_seen(user.id, [internship_id])
     
     if action == 'like':
-        user = User.query.filter_by(username=session['username']).first()
-        
-        new_shortlist_item = ShortlistedInternship(
-            title=request.form.get("title"),
-            sector=request.form.get("sector"),
-            location=request.form.get("location"),
-            duration=request.form.get("duration"),
-            stipend=request.form.get("stipend"),
-            user_id=user.id
-        )
-        
-        db.session.add(new_shortlist_item)
-        db.session.commit()
-        
-        flash(f"Saved: {request.form.get('title')}", "success")
+        liked = lookup_postings([internship_id])
+        if liked:
+            save_to_shortlist(user.id, [internship_id])
+            flash(f"Saved: {liked[0]['title']}", "success")
     
-    remaining_recs = session.get("recommendations", [])
-    current_rec = remaining_recs.pop(0) if remaining_recs else None
-    
-    session["recommendations"] = remaining_recs
-    session.modified = True
+    next_recs = pop_recommendations(1, user.id)
+    current_rec = next_recs[0] if next_recs else None
 
     if current_rec:
-        return render_template("recommendations.html", recommendation=current_rec)
+        return render_template("recommendations.html", recommendation=current_rec, swipe_api=True)
     else:
         flash("You've viewed all the recommendations for now!", "info")
-        return render_template("recommendations.html", recommendation=None)
+        return render_template("recommendations.html", recommendation=None, swipe_api=True)
+
+
+# -------------------- Swipe Card API --------------------
+# The swipe page fetches upcoming cards as JSON and posts like/nope events in
+# batches, so a swipe no longer costs a full page render.
+CARD_FIELDS = ["internship_id", "title", "sector", "location", "duration", "stipend"]
+MAX_CARDS_PER_REQUEST = 10
+
+def lookup_postings(ids):
+    records = listing_index.records
+    return [records[i] for i in ids if i in records]
+
+def save_to_shortlist(user_id, ids):
+    # Saving a posting that is already on the shortlist is a no-op.
+    if ids:
+        now = datetime.utcnow()
+        db.session.execute(
+            db.insert(ShortlistedInternship).prefix_with("OR IGNORE"),
+            [{'user_id': user_id, 'internship_id': int(i), 'created_at': now} for i in ids],
+        )
+        db.session.commit()
+
+def pop_recommendations(n, user_id):
+    # Cards already seen are skipped, and the dealt ones join the session's
+    # seen set in the same cookie write as the queue.
+    seen = load_seen(user_id)
+    queue = seen.unseen(session.get("recommendations", [])).tolist()
+    taken, session["recommendations"] = queue[:n], queue[n:]
+    seen.add(taken)
+    cache_seen(seen)
+    session.modified = True
+    return lookup_postings(taken)
+
+@app.route("/api/cards")
+@login_required
+@catalogue_required
+def next_cards():
+    n = min(max(request.args.get("n", 3, type=int), 1), MAX_CARDS_PER_REQUEST)
+    user = User.query.filter_by(username=session['username']).first()
+    cards = [{field: rec[field] for field in CARD_FIELDS} for rec in pop_recommendations(n, user.id)]
+    return jsonify({"cards": cards, "remaining": len(session.get("recommendations", []))})
 
+@app.route("/api/swipes", methods=["POST"])
+@login_required
+@catalogue_required
+def record_swipes():
+    payload = request.get_json(silent=True)
+    swipes = payload.get("swipes", []) if isinstance(payload, dict) else None
+    if not isinstance(swipes, list):
+        return jsonify({"error": "body must be a JSON object with a list of swipes"}), 400
+    liked_ids = [s.get("internship_id") for s in swipes if isinstance(s, dict) and s.get("action") == "like"]
+    liked = lookup_postings([i for i in liked_ids if isinstance(i, int)])
+    user = User.query.filter_by(username=session['username']).first()
+    mark_seen(user.id, [s.get("internship_id") for s in swipes if isinstance(s, dict) and isinstance(s.get("internship_id"), int)])
+
+    save_to_shortlist(user.id, [rec["internship_id"] for rec in liked])
+    return jsonify({"received": len(swipes), "saved": len(liked)})
+
+@app.route("/api/internships")
+@login_required
+@catalogue_required
+def list_internships():
+    from listing_index import SORT_KEYS, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+    sort = request.args.get("sort", "id")
+    order = request.args.get("order", "asc")
+    if sort not in SORT_KEYS or order not in ("asc", "desc"):
+        return jsonify({"error": f"sort must be one of {', '.join(SORT_KEYS)} and order asc or desc"}), 400
+    try:
+        limit = min(max(int(request.args.get("limit", DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        cursor = int(request.args["cursor"]) if request.args.get("cursor") else None
+        closing_within = int(request.args["closing_within"]) if request.args.get("closing_within") else None
+    except ValueError:
+        return jsonify({"error": "limit, cursor and closing_within must be integers"}), 400
+    if closing_within is not None and closing_within < 0:
+        return jsonify({"error": "closing_within must be a number of days, 0 or more"}), 400
+
+    items, next_cursor = listing_index.page(
+        sort=sort,
+        descending=order == "desc",
+        sector=request.args.get("sector"),
+        location=request.args.get("location"),
+        cursor=cursor,
+        limit=limit,
+        closing_within=closing_within,
+    )
+    return jsonify({"items": items, "next_cursor": str(next_cursor) if next_cursor is not None else None})
 
 @app.route("/shortlist")
 @login_required
+@catalogue_required
 def shortlist():
     user = User.query.filter_by(username=session['username']).first()
     
-    saved_internships = ShortlistedInternship.query.filter_by(user_id=user.id).all()
+    saved_ids = [
+        internship_id for (internship_id,) in db.session.query(ShortlistedInternship.internship_id)
+        .filter_by(user_id=user.id).order_by(ShortlistedInternship.created_at, ShortlistedInternship.id)
+    ]
+    # Display fields come from the in-memory catalogue in one pass; postings
+    # that have since expired or been withdrawn are listed as unavailable.
+    records = listing_index.records
+    saved_internships = [records.get(i, {"internship_id": i, "title": None}) for i in saved_ids]
     
     return render_template("shortlist.html", saved=saved_internships)
 
 @app.route("/remove_saved", methods=["POST"])
 @login_required
 def remove_saved():
-    title = request.form["internship"]
+    internship_id = request.form.get("internship_id", type=int)
     user = User.query.filter_by(username=session['username']).first()
     
-    item_to_remove = ShortlistedInternship.query.filter_by(user_id=user.id, title=title).first()
-    
-    if item_to_remove:
-        db.session.delete(item_to_remove)
-        db.session.commit()
+    ShortlistedInternship.query.filter_by(user_id=user.id, internship_id=internship_id).delete()
+    db.session.commit()
     
     return redirect(url_for("shortlist"))
 
 @app.route("/apply", methods=["POST"])
 @login_required
+@catalogue_required
 def apply():
-    internship = request.form["internship"]
-    flash(f"Redirecting to Apply page for {internship}...", "info")
+    internship = lookup_postings([request.form.get("internship_id", type=int)])
+    if not internship:
+        flash("This internship is no longer available.", "error")
+        return redirect(url_for("shortlist"))
+    flash(f"Redirecting to Apply page for {internship[0]['title']}...", "info")
     return redirect(url_for("home"))
 
-if __name__ == "__main__":
+# -------------------- Transfer Size Report --------------------
+# `flask --app app transfer-report` renders each page and compares what a
+# browser downloads. "Inline" counts the page plus its stylesheets/scripts
+# uncompressed, which is what every response carried when they were inlined.
+@contextmanager
+def scratch_database():
+    # Points the app at an empty in-memory database for the duration, so
+    # commands that register throwaway accounts never touch users.db.
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import StaticPool
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    with app.app_context():
+        db.session.remove()
+        engines = db.engines
+        saved, engines[None] = engines[None], engine
+        try:
+            db.create_all()
+            yield
+        finally:
+            db.session.remove()
+            engines[None] = saved
+            engine.dispose()
+
+@app.cli.command("transfer-report")
+def transfer_report():
+    with scratch_database():
+        print_transfer_report()
+
+def print_transfer_report():
+    import re
+
+    client = app.test_client()
+    username = "transfer-report"
+    client.post("/do_register", data={"username": username, "password": username})
+    client.post("/login", data={"username": username, "password": username})
+
+    pages = [("login", "GET", "/"), ("register", "GET", "/register"), ("home", "GET", "/home"),
+             ("dashboard", "GET", "/dashboard"), ("predict", "GET", "/predict"), ("shortlist", "GET", "/shortlist"),
+             ("recommendations", "POST", "/predict")]
+    form = {"education": "College", "skills": "Python, SQL", "sector_interest": "IT", "location_interest": "Remote"}
+
+    print(f"{'page':<16}{'inline':>10}{'html gz':>10}{'assets gz':>11}{'first visit':>13}{'repeat visit':>14}")
+    for name, method, path in pages:
+        plain = client.open(path, method=method, data=form if method == "POST" else None)
+        html = plain.get_data()
+        gzipped = client.open(path, method=method, data=form if method == "POST" else None,
+                              headers={"Accept-Encoding": "gzip"})
+        inline, assets_gz = len(html), 0
+        for asset in re.findall(rb'(?:href|src)="(/static/[^"]+)"', html):
+            asset = asset.decode().replace("&amp;", "&")
+            inline += len(client.get(asset).get_data())
+            assets_gz += len(client.get(asset, headers={"Accept-Encoding": "gzip"}).get_data())
+        html_gz = len(gzipped.get_data())
+        print(f"{name:<16}{inline:>10}{html_gz:>10}{assets_gz:>11}{html_gz + assets_gz:>13}{html_gz:>14}")
+
+# -------------------- Batch Recommendations --------------------
+# `flask --app app precompute-recommendations` scores every user with saved
+# preferences in one pass and stores their top-N lists for predict() and the
+# dashboard. Run it after each catalogue update or retrain (e.g. from cron);
+# until it has, users simply get live scoring.
+@app.cli.command("precompute-recommendations")
+def precompute_recommendations():
+    import numpy as np
+    from precompute import CHUNK_USERS, score_users
+
+    started = time.perf_counter()
+    start_warmup()
+    catalogue_ready.wait()
+    if df is None or df.empty or (model_client is None and (model is None or search_index is None)):
+        print("⚠️ Model or data not loaded. Nothing to precompute.")
+        return
+
     with app.app_context():
         db.create_all()
+        preferences = UserPreferences.query.all()
+        texts = [preference_text(p.education, p.skills, p.sector, p.location) for p in preferences]
+        version = catalogue_version
+
+        if model_client is not None:
+            results = []
+            for start in range(0, len(texts), CHUNK_USERS):
+                results += model_client.top_k_batch(texts[start:start + CHUNK_USERS], STORED_N)
+        else:
+            # A consistent snapshot of the index; workers get plain arrays and
+            # matrices rather than the index itself.
+            with search_index.lock:
+                matrix, ids, row_of = search_index.matrix, search_index.ids, dict(search_index.row_of)
+                index_vectorizer = search_index.vectorizer
+            live_rows = {
+                sector: np.array([row_of[int(i)] for i in expiry_index.live_ids(sector) if int(i) in row_of], dtype=np.int64)
+                for sector in df["sector"].unique()
+            }
+            results = score_users(texts, model, vectorizer, index_vectorizer, matrix, ids, live_rows)
+
+        now = datetime.utcnow()
+        PrecomputedRecommendation.query.delete()
+        if preferences:
+            db.session.execute(db.insert(PrecomputedRecommendation), [
+                {
+                    'user_id': p.user_id,
+                    'internship_ids': ",".join(str(int(i)) for i in top_ids),
+                    'predicted_sector': str(sector),
+                    'preferences_hash': preferences_fingerprint(p.education, p.skills, p.sector, p.location),
+                    'catalogue_version': version,
+                    'created_at': now,
+                }
+                for p, (sector, top_ids) in zip(preferences, results)
+            ])
+        db.session.commit()
+    print(f"📦 Precomputed recommendations for {len(preferences)} users in {time.perf_counter() - started:.1f}s (catalogue {version})")
+
+with app.app_context():
+    init_db()
+
+# Started last, so everything the warm-up hands work to is already defined.
+if WARMUP_MODE == "eager":
+    start_warmup(background=False)
+elif WARMUP_MODE != "lazy":
+    start_warmup()
+
+print(f"🚀 App ready to serve in {(time.perf_counter() - app_started_at) * 1000:.0f} ms (warm-up: {WARMUP_MODE})")
+
+if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
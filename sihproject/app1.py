@@ -1,24 +1,30 @@
-import joblib
 import pandas as pd
 from flask import Flask, render_template, request, redirect, url_for, session, flash
 from functools import wraps
-from sklearn.feature_extraction.text import TfidfVectorizer
 import ast
 import random
+from model_client import ModelClient
+from assets import init_assets
 
 app = Flask(__name__)
 app.secret_key = "secret123"  # for session storage
+init_assets(app)
 
 # -------------------- In-memory User Database --------------------
 # NOTE: This is for demonstration only. A real application would use a database.
 users = {'user': 'pass'}
 
 # -------------------- Load Data and Model --------------------
-try:
-    model = joblib.load("internshipmodel.pkl")
-except FileNotFoundError:
-    model = None
-    print("⚠️ internshipmodel.pkl not found. Predictions won't work.")
+# With MODEL_SERVER_SOCKET set, sectors are predicted by model_server.py and
+# this process loads neither the model nor scikit-learn.
+model_client = ModelClient.from_env()
+model = None
+if model_client is None:
+    import joblib
+    try:
+        model = joblib.load("internshipmodel.pkl")
+    except FileNotFoundError:
+        print("⚠️ internshipmodel.pkl not found. Predictions won't work.")
 
 try:
     df = pd.read_csv("internships.csv")
@@ -36,6 +42,9 @@ if not df.empty:
         df["education_required"].astype(str) + " " +
         df["location"].astype(str)
     )
+
+if not df.empty and model_client is None:
+    from sklearn.feature_extraction.text import TfidfVectorizer
     vectorizer = TfidfVectorizer(stop_words="english", max_features=1000)
     vectorizer.fit(df["text_features"])
 else:
@@ -101,7 +110,7 @@ def home():
 @login_required
 def predict():
     if request.method == "POST":
-        if model is None or df.empty or vectorizer is None:
+        if df.empty or (model_client is None and (model is None or vectorizer is None)):
             flash("Model or data not loaded. Cannot make recommendations.", "error")
             return redirect(url_for("home"))
 
@@ -113,8 +122,11 @@ def predict():
             
             user_input_text = f"{sector_interest} {skills} {education} {location_interest}"
             
-            X_user = vectorizer.transform([user_input_text])
-            predicted_sector = model.predict(X_user)[0]
+            if model_client is not None:
+                predicted_sector = model_client.predict(user_input_text)
+            else:
+                X_user = vectorizer.transform([user_input_text])
+                predicted_sector = model.predict(X_user)[0]
             
             recommended_internships = df[df["sector"] == predicted_sector].to_dict('records')
             
@@ -142,13 +154,16 @@ def predict():
 def next_recommendation():
     action = request.form.get('action')
     
-    if action == 'like':
+    match = df[df["internship_id"] == request.form.get("internship_id", type=int)]
+    if action == 'like' and not match.empty:
+        rec = match.iloc[0]
         internship = {
-            "title": request.form.get("title"),
-            "sector": request.form.get("sector"),
-            "location": request.form.get("location"),
-            "duration": request.form.get("duration"),
-            "stipend": request.form.get("stipend")
+            "internship_id": int(rec["internship_id"]),
+            "title": rec["title"],
+            "sector": rec["sector"],
+            "location": rec["location"],
+            "duration": rec["duration"],
+            "stipend": str(rec["stipend"])
         }
         if internship not in session["saved"]:
             session["saved"].append(internship)
@@ -176,16 +191,17 @@ def shortlist():
 @app.route("/remove_saved", methods=["POST"])
 @login_required
 def remove_saved():
-    title = request.form["internship"]
+    internship_id = request.form.get("internship_id", type=int)
     if "saved" in session:
-        session["saved"] = [i for i in session["saved"] if i["title"] != title]
+        session["saved"] = [i for i in session["saved"] if i.get("internship_id") != internship_id]
         session.modified = True
     return redirect(url_for("shortlist"))
 
 @app.route("/apply", methods=["POST"])
 @login_required
 def apply():
-    internship = request.form["internship"]
+    match = df[df["internship_id"] == request.form.get("internship_id", type=int)]
+    internship = match.iloc[0]["title"] if not match.empty else "this internship"
     flash(f"Redirecting to Apply page for {internship}...", "info")
     return redirect(url_for("home"))
 
@@ -0,0 +1,119 @@
+import gzip
+import hashlib
+import os
+
+from flask import current_app, request, url_for
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# -------------------- Asset Settings --------------------
+IMMUTABLE_MAX_AGE = 31536000  # one year; the fingerprint changes with the file
+COMPRESS_MIN_BYTES = 500
+COMPRESSIBLE_TYPES = {"text/html", "text/css", "application/javascript", "text/javascript", "application/json"}
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+_fingerprints = {}
+_compressed_assets = {}
+
+
+# -------------------- Fingerprinting --------------------
+def _fingerprint(static_folder, filename):
+    path = os.path.join(static_folder, filename)
+    mtime = os.path.getmtime(path)
+    cached = _fingerprints.get(filename)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path, "rb") as f:
+        digest = hashlib.md5(f.read()).hexdigest()[:12]
+    _fingerprints[filename] = (mtime, digest)
+    return digest
+
+
+def asset_url(filename):
+    # Content-hashed URLs let browsers cache assets forever: any edit to the
+    # file changes `v`, so clients fetch the new copy on their next page load.
+    return url_for("static", filename=filename, v=_fingerprint(current_app.static_folder, filename))
+
+
+# -------------------- Compression --------------------
+def _negotiate(accept_encoding):
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.lower()] = q
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def _compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+def compress_response(response):
+    # Only full 200 bodies are compressed (and cached below): a 206 carries a
+    # byte range of the uncompressed file, and compressing it would hand that
+    # fragment to every later client of the same fingerprint.
+    if (response.status_code != 200 or "Content-Range" in response.headers
+            or response.is_streamed and not response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = _negotiate(request.headers.get("Accept-Encoding", ""))
+    if encoding is None:
+        return response
+
+    response.direct_passthrough = False
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return response
+
+    if request.endpoint == "static" and request.args.get("v"):
+        # Static files never change under a given fingerprint, so each one is
+        # compressed once per encoding and served from memory afterwards.
+        key = (request.path, request.args.get("v"), encoding)
+        if key not in _compressed_assets:
+            _compressed_assets[key] = _compress(data, encoding)
+        compressed = _compressed_assets[key]
+    else:
+        compressed = _compress(data, encoding)
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    # Byte ranges would refer to the uncompressed file, so stop offering them.
+    response.headers.pop("Accept-Ranges", None)
+    # Like nginx, downgrade the ETag to weak: the bytes differ per encoding but
+    # the representation is the same, and weak tags still match If-None-Match.
+    etag, _ = response.get_etag()
+    if etag:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def cache_fingerprinted_assets(response):
+    if request.endpoint == "static" and request.args.get("v") and response.status_code in (200, 304):
+        response.headers["Cache-Control"] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    return response
+
+
+def init_assets(app):
+    app.jinja_env.globals["asset_url"] = asset_url
+    app.after_request(cache_fingerprinted_assets)
+    app.after_request(compress_response)
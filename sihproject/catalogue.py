@@ -0,0 +1,134 @@
+import ast
+import hashlib
+import os
+
+# -------------------- Catalogue Loading --------------------
+# Building blocks shared by app.py and model_server.py for loading the
+# postings, the model and the vectorizers. Heavy libraries are imported inside
+# each function, so importing this module stays cheap and a process only pays
+# for the pieces it actually uses.
+MODEL_PICKLE = "internshipmodel.pkl"
+TRAINING_CSV = "internships.csv"
+
+
+def build_text_features(frame):
+    return (
+        frame["title"].astype(str) + " " +
+        frame["sector"].astype(str) + " " +
+        frame["required_skills"].astype(str) + " " +
+        frame["education_required"].astype(str) + " " +
+        frame["location"].astype(str)
+    )
+
+
+def parse_skills(values):
+    return values.apply(lambda x: ast.literal_eval(x) if isinstance(x, str) else [])
+
+
+def load_model():
+    # train.py also exports the model (with the vectorizer it was trained on)
+    # to a NumPy-only runtime; that is served when present, the pickle otherwise.
+    # Returns (vectorizer or None, model or None).
+    from model_runtime import RUNTIME_PATH, load_runtime
+
+    if os.path.exists(RUNTIME_PATH):
+        return load_runtime(RUNTIME_PATH)
+    import joblib
+
+    try:
+        return None, joblib.load(MODEL_PICKLE)
+    except FileNotFoundError:
+        print("⚠️ internshipmodel.pkl not found. Predictions won't work.")
+        return None, None
+    except Exception as e:
+        # e.g. pickled by a scikit-learn version that is not the installed one
+        print(f"⚠️ internshipmodel.pkl could not be loaded ({type(e).__name__}: {e}). Predictions won't work.")
+        return None, None
+
+
+def load_postings():
+    # Once ingest.py has populated the posting store it becomes the catalogue;
+    # until then the bundled CSV is used. Returns the frame and the store's
+    # last change sequence number (None for the CSV), which change polling
+    # starts from.
+    import pandas as pd
+    from posting_store import POSTINGS_DB, PostingStore
+
+    change_seq = None
+    try:
+        if os.path.exists(POSTINGS_DB):
+            store = PostingStore(POSTINGS_DB)
+            change_seq = store.last_change()
+            frame = store.load_dataframe()
+            store.close()
+        else:
+            frame = pd.read_csv(TRAINING_CSV)
+        frame['required_skills'] = parse_skills(frame['required_skills'])
+    except FileNotFoundError:
+        frame = pd.DataFrame()
+        print("⚠️ internships.csv not found. No internships will be available.")
+    return frame, change_seq
+
+
+def version_stamp(change_seq=None):
+    # Identifies the model and catalogue that recommendations were computed
+    # from: the model artifact load_model() would pick, plus the posting
+    # store's last change (or the CSV file, before the store exists).
+    from model_runtime import RUNTIME_PATH
+
+    parts = [str(change_seq)]
+    paths = [RUNTIME_PATH if os.path.exists(RUNTIME_PATH) else MODEL_PICKLE]
+    if change_seq is None:
+        paths.append(TRAINING_CSV)
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            parts.append(f"{path}:{stat.st_size}:{stat.st_mtime_ns}")
+        except FileNotFoundError:
+            parts.append(f"{path}:missing")
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def dedupe(frame):
+    # Near-duplicate postings collapse onto one canonical row (its id is kept in
+    # `cluster_id`) so the same internship never shows up as two swipe cards.
+    from dedup import dedupe_postings, format_report
+
+    if frame.empty:
+        return frame
+    frame, report = dedupe_postings(frame)
+    print(format_report(report))
+    return frame
+
+
+def fit_vectorizers(frame, compiled_vectorizer=None):
+    # The model was trained on features fit over internships.csv, so when the
+    # catalogue comes from the posting store it gets its own vectorizer and the
+    # model uses the exported one, or one fit on the training CSV. The index may
+    # later refit its copy when the catalogue drifts; the model's never changes.
+    # Returns (model vectorizer, index vectorizer).
+    import pandas as pd
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from posting_store import POSTINGS_DB
+
+    index_vectorizer = TfidfVectorizer(stop_words="english", max_features=1000)
+    index_vectorizer.fit(frame["text_features"])
+    model_vectorizer = index_vectorizer
+    if compiled_vectorizer is not None:
+        model_vectorizer = compiled_vectorizer
+    elif os.path.exists(POSTINGS_DB) and os.path.exists(TRAINING_CSV):
+        model_vectorizer = TfidfVectorizer(stop_words="english", max_features=1000)
+        model_vectorizer.fit(build_text_features(pd.read_csv(TRAINING_CSV)))
+    return model_vectorizer, index_vectorizer
+
+
+def prepare_changes(changes):
+    # Splits a batch from PostingStore.changes_since into the rows to (re)add
+    # and the full batch, whose ids are all dropped first. Rows the ingest-time
+    # dedup marked as duplicates are treated like removals.
+    changes = changes.copy()
+    changes["required_skills"] = parse_skills(changes["required_skills"])
+    changes["cluster_id"] = changes["cluster_id"].fillna(changes["internship_id"]).astype(int)
+    live = changes[(changes["removed"] == 0) & (changes["cluster_id"] == changes["internship_id"])].copy()
+    live["text_features"] = build_text_features(live)
+    return live, changes
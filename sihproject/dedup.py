@@ -0,0 +1,197 @@
+import re
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+# -------------------- MinHash / LSH Settings --------------------
+# 64 hash functions split into 8 bands of 8 rows puts the LSH "S-curve"
+# around a Jaccard similarity of ~0.77, so only close matches become candidates.
+NUM_PERM = 64
+NUM_BANDS = 8
+SIMILARITY_THRESHOLD = 0.8
+CHUNK_ROWS = 200_000
+
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+# -------------------- Tokenisation --------------------
+_QUOTED_ITEM = re.compile(r"['\"]([^'\"]+)['\"]")
+
+
+def _skill_list(value):
+    # The CSV stores skills as "['SQL', 'Excel']"; the app parses them into
+    # lists, so both shapes are accepted here.
+    if isinstance(value, str):
+        return _QUOTED_ITEM.findall(value) or value.split(",")
+    if isinstance(value, (list, tuple, set)):
+        return [str(v) for v in value]
+    return []
+
+
+def _tokens_by_value(values, tokenize, prefix):
+    # Postings repeat the same titles and skill strings over and over, so each
+    # distinct value is tokenised once and the hashes are fanned back out to
+    # every row through its factorised code.
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    tokens = pd.Series(tokenize(pd.Series(uniques, dtype=object)).to_numpy()).explode()
+    tokens = tokens.dropna().astype(str).str.strip().str.lower()
+    tokens = tokens[tokens != ""]
+    owners = tokens.index.to_numpy()
+    hashes = pd.util.hash_array((prefix + tokens).to_numpy(dtype=object))
+
+    counts = np.bincount(owners, minlength=len(uniques))
+    offsets = np.r_[0, np.cumsum(counts)[:-1]]
+    per_row = counts[codes]
+    rows = np.repeat(np.arange(len(codes)), per_row)
+    # position of every emitted token inside its owner's run of hashes
+    within = np.arange(per_row.sum()) - np.repeat(np.cumsum(per_row) - per_row, per_row)
+    return rows, hashes[np.repeat(offsets[codes], per_row) + within]
+
+
+def _token_hashes(df):
+    # One hashed token per title word, skill and sector for every row, returned
+    # as parallel (row, hash) arrays sorted by row with duplicates removed.
+    skills = df["required_skills"].map(lambda v: tuple(v) if isinstance(v, (list, set)) else v).to_numpy(dtype=object)
+    pieces = [
+        _tokens_by_value(df["title"].astype(str).to_numpy(dtype=object), lambda s: s.str.split(), "title:"),
+        _tokens_by_value(skills, lambda s: s.map(_skill_list), "skill:"),
+        _tokens_by_value(df["sector"].astype(str).to_numpy(dtype=object), lambda s: s.map(lambda v: [v]), "sector:"),
+    ]
+    token_rows = np.concatenate([piece[0] for piece in pieces]).astype(np.int64)
+    token_hashes = np.concatenate([piece[1] for piece in pieces]) & _MAX_HASH
+
+    order = np.lexsort((token_hashes, token_rows))
+    token_rows, token_hashes = token_rows[order], token_hashes[order]
+    unique = np.r_[True, (token_rows[1:] != token_rows[:-1]) | (token_hashes[1:] != token_hashes[:-1])]
+    return token_rows[unique], token_hashes[unique]
+
+
+# -------------------- MinHash Signatures --------------------
+def minhash_signatures(df, num_perm=NUM_PERM, seed=1):
+    n = len(df)
+    signatures = np.full((n, num_perm), _MAX_HASH, dtype=np.uint64)
+    if n == 0:
+        return signatures.astype(np.uint32)
+
+    # Multiply-shift hashing: (a * x + b) >> 32 with odd 64-bit a gives a
+    # cheap universal family without any modulo arithmetic.
+    rng = np.random.RandomState(seed)
+    a = (rng.randint(0, 1 << 62, size=num_perm).astype(np.uint64) << np.uint64(1)) | np.uint64(1)
+    b = rng.randint(0, 1 << 62, size=num_perm).astype(np.uint64)
+
+    token_rows, token_hashes = _token_hashes(df)
+
+    for start in range(0, n, CHUNK_ROWS):
+        stop = min(start + CHUNK_ROWS, n)
+        lo, hi = np.searchsorted(token_rows, [start, stop])
+        if lo == hi:
+            continue
+        rows = token_rows[lo:hi]
+        hashes = token_hashes[lo:hi]
+        # reduceat needs the offset of every row's first token within the chunk
+        present, offsets = np.unique(rows, return_index=True)
+        with np.errstate(over="ignore"):
+            for k in range(num_perm):
+                permuted = (a[k] * hashes + b[k]) >> np.uint64(32)
+                signatures[present, k] = np.minimum.reduceat(permuted, offsets)
+
+    return signatures.astype(np.uint32)
+
+
+# -------------------- LSH Banding --------------------
+def _band_keys(band):
+    key = np.zeros(band.shape[0], dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for column in band.T:
+            key = (key ^ column.astype(np.uint64)) * np.uint64(0x100000001B3)
+    return key
+
+
+def lsh_candidate_pairs(signatures, num_bands=NUM_BANDS):
+    n, num_perm = signatures.shape
+    rows_per_band = num_perm // num_bands
+    left, right = [], []
+    for band_index in range(num_bands):
+        band = signatures[:, band_index * rows_per_band:(band_index + 1) * rows_per_band]
+        keys = _band_keys(band)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        # Every row in a bucket is paired with the bucket's first row, which is
+        # enough to connect the whole bucket without enumerating all pairs.
+        starts = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+        leaders = order[np.maximum.accumulate(np.where(starts, np.arange(n), 0))]
+        members = order[~starts]
+        left.append(members)
+        right.append(leaders[~starts])
+    if not left:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(left), np.concatenate(right)
+
+
+# -------------------- Clustering --------------------
+def find_duplicates(df, threshold=SIMILARITY_THRESHOLD, num_perm=NUM_PERM, num_bands=NUM_BANDS):
+    timings = {}
+    started = time.perf_counter()
+
+    signatures = minhash_signatures(df, num_perm=num_perm)
+    timings["signature_ms"] = (time.perf_counter() - started) * 1000
+
+    lsh_started = time.perf_counter()
+    left, right = lsh_candidate_pairs(signatures, num_bands=num_bands)
+    if len(left):
+        similarity = (signatures[left] == signatures[right]).mean(axis=1)
+        keep = similarity >= threshold
+        left, right = left[keep], right[keep]
+    timings["lsh_ms"] = (time.perf_counter() - lsh_started) * 1000
+
+    n = len(df)
+    graph = coo_matrix((np.ones(len(left), dtype=np.int8), (left, right)), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+
+    # The posting with the lowest id in each cluster is kept as the canonical one
+    # and its id doubles as the cluster id.
+    ids = df["internship_id"].to_numpy()
+    canonical_ids = pd.Series(ids).groupby(labels).transform("min").to_numpy()
+
+    result = df.copy()
+    result["cluster_id"] = canonical_ids
+    result["is_canonical"] = ids == canonical_ids
+    timings["total_ms"] = (time.perf_counter() - started) * 1000
+
+    report = {
+        "rows": n,
+        "clusters": int(len(np.unique(labels))) if n else 0,
+        "duplicates": int(n - result["is_canonical"].sum()),
+        "candidate_pairs": int(len(left)),
+        **timings,
+    }
+    return result, report
+
+
+def dedupe_postings(df, threshold=SIMILARITY_THRESHOLD):
+    if df.empty:
+        return df, {"rows": 0, "clusters": 0, "duplicates": 0, "candidate_pairs": 0,
+                    "signature_ms": 0.0, "lsh_ms": 0.0, "total_ms": 0.0}
+    clustered, report = find_duplicates(df, threshold=threshold)
+    canonical = clustered[clustered["is_canonical"]].drop(columns=["is_canonical"]).reset_index(drop=True)
+    return canonical, report
+
+
+def format_report(report):
+    return (
+        f"🧹 Dedup: {report['rows']} postings -> {report['clusters']} clusters "
+        f"({report['duplicates']} duplicates removed) in {report['total_ms']:.1f} ms "
+        f"[minhash {report['signature_ms']:.1f} ms, lsh {report['lsh_ms']:.1f} ms]"
+    )
+
+
+if __name__ == "__main__":
+    postings = pd.read_csv("internships.csv")
+    clustered, report = find_duplicates(postings)
+    print(format_report(report))
+    duplicates = clustered[~clustered["is_canonical"]]
+    if not duplicates.empty:
+        print(duplicates[["internship_id", "cluster_id", "title", "sector", "location"]].to_string(index=False))
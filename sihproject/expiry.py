@@ -0,0 +1,77 @@
+import os
+import threading
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# -------------------- Clock --------------------
+# CATALOGUE_DATE=YYYY-MM-DD pins "today", e.g. to demo the bundled CSV whose
+# deadlines are all in the past.
+def today():
+    pinned = os.environ.get("CATALOGUE_DATE")
+    return date.fromisoformat(pinned) if pinned else date.today()
+
+
+def _day_numbers(deadlines):
+    # Days since the epoch; postings without a deadline never expire.
+    days = pd.to_datetime(pd.Series(deadlines), errors="coerce").to_numpy(dtype="datetime64[D]")
+    never = np.iinfo(np.int64).max
+    return np.where(np.isnat(days), never, days.astype(np.int64))
+
+
+def _day_number(day):
+    return int(np.datetime64(day, "D").astype(np.int64))
+
+
+# -------------------- Expiry Index --------------------
+# Posting ids kept sorted by deadline, once for the whole catalogue and once
+# per sector. The live postings are always a suffix of each array, so finding
+# them is a binary search plus a slice.
+class ExpiryIndex:
+    def __init__(self, ids, deadlines, sectors):
+        self.lock = threading.Lock()
+        self.groups = {}
+        self.add(ids, deadlines, sectors)
+
+    def _insert(self, key, ids, days):
+        current_days, current_ids = self.groups.get(key, (np.empty(0, np.int64), np.empty(0, np.int64)))
+        days = np.concatenate([current_days, days])
+        ids = np.concatenate([current_ids, ids])
+        order = np.argsort(days, kind="stable")
+        self.groups[key] = (days[order], ids[order])
+
+    def add(self, ids, deadlines, sectors):
+        ids = np.asarray(ids, dtype=np.int64)
+        days = _day_numbers(deadlines)
+        sectors = np.asarray(sectors, dtype=object)
+        with self.lock:
+            self._insert(None, ids, days)
+            for sector in pd.unique(sectors):
+                mask = sectors == sector
+                self._insert(sector, ids[mask], days[mask])
+
+    def remove(self, ids):
+        ids = np.asarray(list(ids), dtype=np.int64)
+        with self.lock:
+            for key, (days, group_ids) in list(self.groups.items()):
+                keep = ~np.isin(group_ids, ids)
+                self.groups[key] = (days[keep], group_ids[keep])
+
+    def live_ids(self, sector=None, on=None):
+        with self.lock:
+            days, ids = self.groups.get(sector, (np.empty(0, np.int64), np.empty(0, np.int64)))
+        start = np.searchsorted(days, _day_number(on or today()), side="left")
+        return ids[start:]
+
+    def prune(self, on=None):
+        # Expired postings are the prefix of every group, so pruning is a slice
+        # per group. The ids are returned so callers can evict them elsewhere.
+        first_day = _day_number(on or today())
+        with self.lock:
+            days, ids = self.groups.get(None, (np.empty(0, np.int64), np.empty(0, np.int64)))
+            expired = ids[:np.searchsorted(days, first_day, side="left")]
+            for key, (days, group_ids) in self.groups.items():
+                cut = np.searchsorted(days, first_day, side="left")
+                self.groups[key] = (days[cut:], group_ids[cut:])
+        return expired
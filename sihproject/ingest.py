@@ -0,0 +1,338 @@
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import re
+import sqlite3
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from dedup import find_duplicates, format_report
+from posting_store import POSTINGS_DB, PostingStore
+
+# -------------------- Pipeline Settings --------------------
+BATCH_SIZE = 500
+WRITE_QUEUE_SIZE = 8  # batches waiting for the writer before fetches pause
+TOTAL_CONNECTIONS = 64
+DEFAULT_HOST_CONCURRENCY = 4
+DEFAULT_HOST_RATE = 5.0  # requests per second
+REQUEST_TIMEOUT = 30
+
+
+# -------------------- Per-Host Limits --------------------
+class HostLimiter:
+    # Caps in-flight requests with a semaphore and spaces request starts with a
+    # simple token bucket so one slow or strict board can't stall the others.
+    def __init__(self, concurrency, rate):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_start = 0.0
+        self.lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        async with self.lock:
+            now = time.monotonic()
+            wait = self.next_start - now
+            self.next_start = max(now, self.next_start) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.semaphore.release()
+
+
+# -------------------- Normalisation --------------------
+def _skills_repr(value):
+    # Stored exactly like internships.csv ("['SQL', 'Excel']") so the app's
+    # existing parsing works for ingested rows too.
+    if isinstance(value, str):
+        value = [part.strip() for part in value.strip("[]").replace("'", "").split(",")]
+    return repr([str(skill) for skill in (value or []) if str(skill).strip()])
+
+
+def _duration(value):
+    match = re.search(r"\d+", str(value or ""))
+    return f"{match.group()} months" if match else None
+
+
+def _stipend(value):
+    # The first number only: a range like "25,000-30,000" is stored as its
+    # lower bound, not as the digits of both ends run together.
+    match = re.search(r"\d[\d,]*(?:\.\d+)?", str(value or ""))
+    return int(float(match.group().replace(",", ""))) if match else 0
+
+
+def normalise(source, raw, fetched_at):
+    external_id = raw.get("internship_id") or raw.get("id") or raw.get("url")
+    title = (raw.get("title") or "").strip()
+    if not external_id or not title:
+        return None
+    return {
+        "source": source,
+        "external_id": str(external_id),
+        "title": title,
+        "sector": (raw.get("sector") or "").strip() or None,
+        "required_skills": _skills_repr(raw.get("required_skills", raw.get("skills"))),
+        "education_required": (raw.get("education_required") or raw.get("education") or "").strip() or None,
+        "location": (raw.get("location") or "").strip() or None,
+        "duration": _duration(raw.get("duration")),
+        "stipend": _stipend(raw.get("stipend")),
+        "deadline": (raw.get("deadline") or "").strip()[:10] or None,
+        "removed": 1 if str(raw.get("status", "")).lower() in ("closed", "removed") else 0,
+        "updated_at": fetched_at,
+    }
+
+
+# -------------------- Streaming Parsers --------------------
+async def _lines(response):
+    async for raw in response.content:
+        line = raw.decode(response.charset or "utf-8", errors="replace").rstrip("\r\n")
+        if line:
+            yield line
+
+
+async def parse_jsonl(response):
+    async for line in _lines(response):
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            continue
+
+
+async def _csv_records(response):
+    # A quoted field may contain newlines, so physical lines are collected
+    # until their quotes balance ("" escapes count twice, so they keep the
+    # parity) and then yielded as one record.
+    pending = ""
+    async for raw in response.content:
+        pending += raw.decode(response.charset or "utf-8", errors="replace")
+        if pending.count('"') % 2:
+            continue
+        if pending.strip():
+            yield pending
+        pending = ""
+    if pending.strip():
+        yield pending
+
+
+async def parse_csv(response):
+    header = None
+    async for record in _csv_records(response):
+        row = next(csv.reader(io.StringIO(record)))
+        if header is None:
+            header = row
+            continue
+        yield dict(zip(header, row))
+
+
+PARSERS = {"jsonl": parse_jsonl, "csv": parse_csv}
+
+
+# -------------------- Source Stats --------------------
+class SourceStats:
+    def __init__(self, name):
+        self.name = name
+        self.requests = 0
+        self.not_modified = 0
+        self.errors = 0
+        self.records = 0
+        self.upserted = 0
+        self.bytes = 0
+        self.latencies = []
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def summary(self):
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        latencies = sorted(self.latencies)
+
+        def pct(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0.0
+
+        return {
+            "source": self.name,
+            "requests": self.requests,
+            "not_modified": self.not_modified,
+            "errors": self.errors,
+            "records": self.records,
+            "upserted": self.upserted,
+            "kb": self.bytes / 1024,
+            "records_per_s": self.records / elapsed if elapsed else 0.0,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "elapsed_s": elapsed,
+        }
+
+
+# -------------------- Store Writer --------------------
+# SQLite commits block, so they run in a worker thread instead of on the event
+# loop, where each one would stall every other source's fetch. A single writer
+# drains a bounded queue, so writes stay serialised and in order (a URL's
+# validators are saved only after its rows), and fetches pause once it falls
+# WRITE_QUEUE_SIZE batches behind. A URL with a failed write keeps its old
+# validators, so the next run fetches it in full instead of getting a 304.
+class StoreWriter:
+    def __init__(self, path):
+        self.store = PostingStore(path, check_same_thread=False)
+        self.queue = asyncio.Queue(WRITE_QUEUE_SIZE)
+        self.failed_urls = set()
+        self.task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while (item := await self.queue.get()) is not None:
+            url, write, args = item
+            try:
+                await asyncio.to_thread(write, *args)
+            except sqlite3.Error as e:
+                self.failed_urls.add(url)
+                print(f"⚠️ Write to {self.store.path} for {url} failed ({e})")
+
+    async def upsert(self, url, batch, stats):
+        if batch:
+            await self.queue.put((url, self._upsert, (batch, stats)))
+
+    def _upsert(self, batch, stats):
+        stats.upserted += self.store.upsert_many(batch)
+
+    async def set_validators(self, url, etag, last_modified):
+        await self.queue.put((url, self._set_validators, (url, etag, last_modified)))
+
+    def _set_validators(self, url, etag, last_modified):
+        # Runs after every batch queued before it, so all of them have been tried.
+        if url in self.failed_urls:
+            print(f"⚠️ Not saving validators for {url}: some of its rows were not written")
+            return
+        self.store.set_validators(url, etag, last_modified)
+
+    async def close(self):
+        await self.queue.put(None)
+        await self.task
+        self.store.close()
+
+
+# -------------------- Fetching --------------------
+async def fetch_url(session, limiter, store, writer, source, url, stats):
+    parser = PARSERS[source.get("format", "csv")]
+    etag, last_modified = store.get_validators(url)
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    async with limiter:
+        started = time.perf_counter()
+        stats.requests += 1
+        try:
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304:
+                    stats.not_modified += 1
+                    return
+                response.raise_for_status()
+
+                fetched_at = time.time()
+                batch = []
+                async for raw in parser(response):
+                    stats.records += 1
+                    record = normalise(source["name"], raw, fetched_at)
+                    if record:
+                        batch.append(record)
+                    if len(batch) >= BATCH_SIZE:
+                        await writer.upsert(url, batch, stats)
+                        batch = []
+                await writer.upsert(url, batch, stats)
+                stats.bytes += response.content.total_bytes
+
+                await writer.set_validators(url, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            stats.errors += 1
+            print(f"⚠️ {source['name']}: {url} failed ({e})")
+        finally:
+            stats.latencies.append(time.perf_counter() - started)
+
+
+async def ingest_sources(sources, store):
+    limiters = {}
+    stats = {source["name"]: SourceStats(source["name"]) for source in sources}
+    # One pooled session for every source; aiohttp keeps connections alive and
+    # reuses them per host. The connector caps the total socket count while the
+    # HostLimiters cap each host.
+    connector = aiohttp.TCPConnector(limit=TOTAL_CONNECTIONS)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+
+    writer = StoreWriter(store.path)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        by_source = defaultdict(list)
+        for source in sources:
+            for url in source.get("urls") or [source["url"]]:
+                host = urlsplit(url).netloc
+                if host not in limiters:
+                    limiters[host] = HostLimiter(
+                        source.get("concurrency", DEFAULT_HOST_CONCURRENCY),
+                        source.get("rate_per_second", DEFAULT_HOST_RATE),
+                    )
+                by_source[source["name"]].append(
+                    fetch_url(session, limiters[host], store, writer, source, url, stats[source["name"]])
+                )
+
+        async def run_source(name, fetches):
+            await asyncio.gather(*fetches)
+            stats[name].finished = time.perf_counter()
+
+        await asyncio.gather(*(run_source(name, fetches) for name, fetches in by_source.items()))
+    await writer.close()
+
+    return [stats[source["name"]].summary() for source in sources]
+
+
+def refresh_clusters(store):
+    # Ingest-time duplicate pass: the same posting scraped from two boards ends
+    # up in one cluster, and the app only serves the canonical row.
+    catalogue = store.load_dataframe()
+    if catalogue.empty:
+        return None
+    clustered, report = find_duplicates(catalogue)
+    store.assign_clusters(clustered)
+    return report
+
+
+def print_stats(summaries):
+    print(f"{'source':<20}{'req':>6}{'304':>6}{'err':>6}{'records':>10}{'upserted':>10}"
+          f"{'KB':>10}{'rec/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for s in summaries:
+        print(f"{s['source']:<20}{s['requests']:>6}{s['not_modified']:>6}{s['errors']:>6}{s['records']:>10}"
+              f"{s['upserted']:>10}{s['kb']:>10.1f}{s['records_per_s']:>10.0f}{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch internship postings from the configured sources.")
+    parser.add_argument("sources", nargs="?", default="sources.json", help="JSON file listing the sources to ingest")
+    parser.add_argument("--db", default=POSTINGS_DB, help="posting store to upsert into")
+    parser.add_argument("--seed-csv", default="internships.csv", help="CSV used to seed an empty store")
+    args = parser.parse_args()
+
+    with open(args.sources) as f:
+        sources = json.load(f)
+
+    store = PostingStore(args.db)
+    if store.is_empty() and os.path.exists(args.seed_csv):
+        print(f"🌱 Seeded {store.seed_from_csv(args.seed_csv)} postings from {args.seed_csv}")
+
+    summaries = asyncio.run(ingest_sources(sources, store))
+    print_stats(summaries)
+
+    report = refresh_clusters(store)
+    if report:
+        print(format_report(report))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+
+from expiry import today
+
+# -------------------- Listing Settings --------------------
+SORT_KEYS = ("stipend", "duration", "deadline", "id")
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+LISTING_FIELDS = ["internship_id", "title", "sector", "location", "duration", "stipend", "deadline", "required_skills"]
+
+# Each sort value is packed with the posting id into one int64
+# (value << 32 | id), which gives a total, stable order and lets a cursor be
+# a single number that binary search can resume from.
+_ID_BITS = 32
+_MAX_VALUE = (1 << 30) - 1
+
+
+def _sort_values(df):
+    months = pd.to_numeric(df["duration"].astype(str).str.extract(r"(\d+)")[0], errors="coerce")
+    deadlines = pd.to_datetime(df["deadline"], errors="coerce").to_numpy(dtype="datetime64[D]")
+    return {
+        "stipend": pd.to_numeric(df["stipend"], errors="coerce").fillna(0).to_numpy(dtype=np.int64),
+        "duration": months.fillna(_MAX_VALUE).to_numpy(dtype=np.int64),
+        # postings without a deadline sort last
+        "deadline": np.where(np.isnat(deadlines), _MAX_VALUE, deadlines.astype(np.int64)),
+        "id": np.zeros(len(df), dtype=np.int64),
+    }
+
+
+def _grouped(packed, sectors, locations):
+    # Sorted packed keys for every (sector, location) filter combination,
+    # including "any", that the given rows fall in.
+    groups = {(None, None): np.arange(len(sectors))}
+    for column, values in ((0, sectors), (1, locations)):
+        for value in np.unique(values):
+            key = (value, None) if column == 0 else (None, value)
+            groups[key] = np.flatnonzero(values == value)
+    for (sector, location), rows in pd.Series(np.arange(len(sectors))).groupby([sectors, locations]).groups.items():
+        groups[(sector, location)] = np.asarray(rows)
+    return {group: {key: np.sort(values[rows]) for key, values in packed.items()} for group, rows in groups.items()}
+
+
+# -------------------- Listing Index --------------------
+# For every (sector, location) filter combination, including "any", each sort
+# key gets a sorted array of packed keys. A page is then one binary search for
+# the cursor plus a slice. Catalogue changes are applied with updated(), which
+# touches only the partitions the changed postings fall in.
+class ListingIndex:
+    def __init__(self, df):
+        self.records = {}
+        self.partitions = {}
+        # Every posting's packed keys in id order, so postings can be found in
+        # their partitions (to remove them) without recomputing anything.
+        self.ids = np.empty(0, dtype=np.int64)
+        self.keys_by_id = {key: np.empty(0, dtype=np.int64) for key in SORT_KEYS}
+        if not df.empty:
+            self._add(df)
+
+    def updated(self, drop_ids, added=None):
+        # Copy-on-write: the new index shares every array the change doesn't
+        # touch, and this one stays valid for requests still paging it.
+        index = ListingIndex.__new__(ListingIndex)
+        index.records = dict(self.records)
+        index.partitions = {group: dict(arrays) for group, arrays in self.partitions.items()}
+        index.ids = self.ids
+        index.keys_by_id = dict(self.keys_by_id)
+        index._drop(np.asarray(drop_ids, dtype=np.int64))
+        if added is not None and not added.empty:
+            index._add(added)
+        return index
+
+    def _add(self, df):
+        ids = df["internship_id"].to_numpy(dtype=np.int64)
+        self.records.update(zip(ids.tolist(), df[LISTING_FIELDS].to_dict("records")))
+        packed = {
+            key: (np.clip(values, 0, _MAX_VALUE) << _ID_BITS) | ids
+            for key, values in _sort_values(df).items()
+        }
+        sectors = df["sector"].astype(str).to_numpy()
+        locations = df["location"].astype(str).to_numpy()
+        for group, keys in _grouped(packed, sectors, locations).items():
+            arrays = self.partitions.setdefault(group, {})
+            for key, values in keys.items():
+                current = arrays.get(key, np.empty(0, dtype=np.int64))
+                arrays[key] = np.insert(current, np.searchsorted(current, values), values)
+
+        order = np.argsort(ids)
+        at = np.searchsorted(self.ids, ids[order])
+        self.ids = np.insert(self.ids, at, ids[order])
+        for key in SORT_KEYS:
+            self.keys_by_id[key] = np.insert(self.keys_by_id[key], at, packed[key][order])
+
+    def _drop(self, ids):
+        at = np.searchsorted(self.ids, ids)
+        found = at < len(self.ids)
+        found[found] = self.ids[at[found]] == ids[found]
+        at = np.unique(at[found])
+        if not len(at):
+            return
+        removed = [self.records.pop(int(posting_id)) for posting_id in self.ids[at]]
+        packed = {key: self.keys_by_id[key][at] for key in SORT_KEYS}
+        sectors = np.asarray([str(rec["sector"]) for rec in removed])
+        locations = np.asarray([str(rec["location"]) for rec in removed])
+        for group, keys in _grouped(packed, sectors, locations).items():
+            arrays = self.partitions[group]
+            for key, values in keys.items():
+                arrays[key] = np.delete(arrays[key], np.searchsorted(arrays[key], values))
+            if not len(arrays["id"]):
+                del self.partitions[group]
+
+        self.ids = np.delete(self.ids, at)
+        for key in SORT_KEYS:
+            self.keys_by_id[key] = np.delete(self.keys_by_id[key], at)
+
+    def page(self, sort="id", descending=False, sector=None, location=None, cursor=None, limit=DEFAULT_PAGE_SIZE,
+             closing_within=None, on=None):
+        partition = self.partitions.get((sector or None, location or None))
+        if partition is None:
+            return [], None
+        keys = partition[sort]
+        mask = np.int64((1 << _ID_BITS) - 1)
+        if closing_within is not None:
+            # Postings whose deadline is within `closing_within` days are one
+            # slice of the partition's deadline order; for other sorts just
+            # that slice is re-sorted, so the cost follows the number of
+            # matches, not the partition size. Cursors work as on a full sort.
+            first_day = int(np.datetime64(on or today(), "D").astype(np.int64))
+            last_day = min(first_day + closing_within, _MAX_VALUE - 1)
+            deadlines = partition["deadline"]
+            keys = deadlines[np.searchsorted(deadlines, first_day << _ID_BITS):
+                             np.searchsorted(deadlines, (last_day + 1) << _ID_BITS)]
+            if sort != "deadline":
+                keys = np.sort(self.keys_by_id[sort][np.searchsorted(self.ids, keys & mask)])
+        if descending:
+            stop = len(keys) if cursor is None else np.searchsorted(keys, cursor, side="left")
+            chunk = keys[max(0, stop - limit):stop][::-1]
+            has_more = stop - limit > 0
+        else:
+            start = 0 if cursor is None else np.searchsorted(keys, cursor, side="right")
+            chunk = keys[start:start + limit]
+            has_more = start + limit < len(keys)
+
+        items = [self.records[int(posting_id)] for posting_id in (chunk & mask)]
+        next_cursor = int(chunk[-1]) if has_more and len(chunk) else None
+        return items, next_cursor
@@ -0,0 +1,103 @@
+import argparse
+import os
+import sqlite3
+from datetime import datetime
+
+from catalogue import load_postings
+from dedup import find_duplicates
+
+USERS_DB = os.path.join("instance", "users.db")
+
+NEW_TABLE = """
+CREATE TABLE shortlisted_internship (
+    id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    internship_id INTEGER NOT NULL,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    UNIQUE (user_id, internship_id),
+    FOREIGN KEY(user_id) REFERENCES user (id)
+)
+"""
+
+
+# -------------------- Shortlist Migration --------------------
+# Older databases stored a copy of each saved posting's title, sector,
+# location, duration and stipend instead of its id. Each row is matched back to
+# the posting it was saved from (its canonical copy, when it has duplicates)
+# and rewritten as (user_id, internship_id, created_at). The old table is kept
+# as shortlisted_internship_legacy, so rows that no longer match anything in
+# the catalogue are not lost.
+def _key(title, sector, location, duration, stipend):
+    try:
+        stipend = str(int(float(stipend)))
+    except (TypeError, ValueError):
+        stipend = str(stipend)
+    return tuple(str(value).strip().lower() for value in (title, sector, location, duration)) + (stipend,)
+
+
+def posting_ids_by_key():
+    frame, _ = load_postings()
+    if frame.empty:
+        return {}
+    clustered, _ = find_duplicates(frame)
+    ids = {}
+    for row in clustered.sort_values("internship_id").itertuples():
+        ids.setdefault(_key(row.title, row.sector, row.location, row.duration, row.stipend), int(row.cluster_id))
+    return ids
+
+
+def needs_migration(conn):
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(shortlisted_internship)")]
+    return bool(columns) and "internship_id" not in columns
+
+
+def migrate(path):
+    conn = sqlite3.connect(path)
+    try:
+        if not needs_migration(conn):
+            print(f"✅ {path} has nothing to migrate.")
+            return
+
+        ids = posting_ids_by_key()
+        with conn:
+            # The write lock is taken before the rows are read, so when several
+            # app workers start on an old database only the first one migrates.
+            conn.execute("BEGIN IMMEDIATE")
+            if not needs_migration(conn):
+                return
+            old_rows = conn.execute(
+                "SELECT id, user_id, title, sector, location, duration, stipend FROM shortlisted_internship ORDER BY id"
+            ).fetchall()
+            now = datetime.utcnow().isoformat(sep=" ")
+            new_rows, unmatched = [], 0
+            for _, user_id, *fields in old_rows:
+                internship_id = ids.get(_key(*fields))
+                if user_id is None or internship_id is None:
+                    unmatched += 1
+                    continue
+                new_rows.append((user_id, internship_id, now))
+
+            conn.execute("ALTER TABLE shortlisted_internship RENAME TO shortlisted_internship_legacy")
+            conn.execute(NEW_TABLE)
+            conn.executemany(
+                "INSERT OR IGNORE INTO shortlisted_internship (user_id, internship_id, created_at) VALUES (?, ?, ?)",
+                new_rows,
+            )
+        saved = conn.execute("SELECT COUNT(*) FROM shortlisted_internship").fetchone()[0]
+        print(f"🔁 Migrated {len(old_rows)} shortlist rows: {saved} saved, "
+              f"{len(new_rows) - saved} duplicates merged, {unmatched} not found in the catalogue")
+        print("   The old rows are kept in shortlisted_internship_legacy; drop it once you are happy with the result.")
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert saved shortlists to posting-id references.")
+    parser.add_argument("--db", default=USERS_DB, help="users database to migrate")
+    args = parser.parse_args()
+    migrate(args.db)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import os
+import socket
+import struct
+import threading
+
+# -------------------- Wire Protocol --------------------
+# Every message is a frame: a 4-byte big-endian length, then the body.
+#
+# Request body:   op (u8) | k (u16) | count (u32) | count x [len (u32) | utf-8 text]
+# Response body:  status (u8), then
+#                 OK:    count (u32) | count x [len (u16) | utf-8 sector | n (u16) | n x id (i32)]
+#                 ERROR: utf-8 message
+#
+# Every call carries a batch of texts; single predictions are batches of one.
+# OP_PREDICT returns each text's sector with no ids, OP_TOP_K the sector and
+# up to k (at most MAX_K) posting ids ranked by similarity.
+MODEL_SERVER_ENV = "MODEL_SERVER_SOCKET"
+MAX_K = 100
+OP_PREDICT = 1
+OP_TOP_K = 2
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+_FRAME = struct.Struct("!I")
+_REQUEST = struct.Struct("!BHI")
+_TEXT = struct.Struct("!I")
+_SHORT = struct.Struct("!H")
+
+
+class ModelServerError(Exception):
+    pass
+
+
+def read_frame(sock):
+    header = _recv_exactly(sock, _FRAME.size)
+    if header is None:
+        return None
+    body = _recv_exactly(sock, _FRAME.unpack(header)[0])
+    if body is None:
+        raise ConnectionError("connection closed mid-frame")
+    return body
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            if chunks:
+                raise ConnectionError("connection closed mid-frame")
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def write_frame(sock, body):
+    sock.sendall(_FRAME.pack(len(body)) + body)
+
+
+def encode_request(op, texts, k=0):
+    parts = [_REQUEST.pack(op, k, len(texts))]
+    for text in texts:
+        data = text.encode("utf-8")
+        parts += [_TEXT.pack(len(data)), data]
+    return b"".join(parts)
+
+
+def decode_request(body):
+    op, k, count = _REQUEST.unpack_from(body)
+    offset = _REQUEST.size
+    texts = []
+    for _ in range(count):
+        (length,) = _TEXT.unpack_from(body, offset)
+        offset += _TEXT.size
+        texts.append(body[offset:offset + length].decode("utf-8"))
+        offset += length
+    return op, k, texts
+
+
+def encode_results(results):
+    parts = [bytes([STATUS_OK]), _TEXT.pack(len(results))]
+    for sector, ids in results:
+        data = str(sector).encode("utf-8")
+        parts += [_SHORT.pack(len(data)), data, _SHORT.pack(len(ids)), struct.pack(f"!{len(ids)}i", *ids)]
+    return b"".join(parts)
+
+
+def encode_error(message):
+    return bytes([STATUS_ERROR]) + message.encode("utf-8")
+
+
+def decode_results(body):
+    if body[0] != STATUS_OK:
+        raise ModelServerError(body[1:].decode("utf-8"))
+    (count,) = _TEXT.unpack_from(body, 1)
+    offset = 1 + _TEXT.size
+    results = []
+    for _ in range(count):
+        (length,) = _SHORT.unpack_from(body, offset)
+        offset += _SHORT.size
+        sector = body[offset:offset + length].decode("utf-8")
+        offset += length
+        (n,) = _SHORT.unpack_from(body, offset)
+        offset += _SHORT.size
+        ids = list(struct.unpack_from(f"!{n}i", body, offset))
+        offset += 4 * n
+        results.append((sector, ids))
+    return results
+
+
+# -------------------- Client --------------------
+# Thin client for model_server.py. Each thread keeps one connection open and
+# reuses it for every call, reconnecting once if the server went away.
+class ModelClient:
+    def __init__(self, path, timeout=5.0):
+        self.path = path
+        self.timeout = timeout
+        self.local = threading.local()
+
+    @classmethod
+    def from_env(cls):
+        path = os.environ.get(MODEL_SERVER_ENV)
+        return cls(path) if path else None
+
+    def _connection(self):
+        sock = getattr(self.local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+            self.local.sock = sock
+        return sock
+
+    def _close(self):
+        sock = getattr(self.local, "sock", None)
+        if sock is not None:
+            sock.close()
+            self.local.sock = None
+
+    def _call(self, op, texts, k=0):
+        request = encode_request(op, texts, k)
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                write_frame(sock, request)
+                body = read_frame(sock)
+                if body is None:
+                    raise ConnectionError("model server closed the connection")
+                return decode_results(body)
+            except socket.timeout as e:
+                # Retrying would only add load to a server that is already slow.
+                self._close()
+                raise ModelServerError(f"model server at {self.path} timed out") from e
+            except OSError as e:
+                # A stale pooled connection fails on first use; retry once on a fresh one.
+                self._close()
+                if attempt:
+                    raise ModelServerError(f"model server at {self.path} unavailable: {e}") from e
+
+    def predict(self, text):
+        return self.predict_batch([text])[0]
+
+    def predict_batch(self, texts):
+        return [sector for sector, _ in self._call(OP_PREDICT, texts)]
+
+    def top_k(self, text, k):
+        return self.top_k_batch([text], k)[0]
+
+    def top_k_batch(self, texts, k):
+        return self._call(OP_TOP_K, texts, k)
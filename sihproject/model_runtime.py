@@ -0,0 +1,225 @@
+import json
+import re
+
+import numpy as np
+
+RUNTIME_PATH = "internshipmodel.npz"
+
+# -------------------- Export --------------------
+# `export_model` runs in train.py and turns the fitted vectorizer and
+# classifier into plain arrays: a weight matrix for linear models, flattened
+# node arrays for trees, per-class statistics for Naive Bayes. It only reads
+# fitted attributes, so this module never imports scikit-learn; serving just
+# needs NumPy.
+
+LINEAR_MODELS = {"LogisticRegression", "LinearSVC", "SGDClassifier", "RidgeClassifier", "Perceptron"}
+TREE_MODELS = {"DecisionTreeClassifier", "ExtraTreeClassifier"}
+FOREST_MODELS = {"RandomForestClassifier", "ExtraTreesClassifier"}
+
+
+def _export_vectorizer(vectorizer):
+    unsupported = (
+        vectorizer.analyzer != "word" or tuple(vectorizer.ngram_range) != (1, 1)
+        or vectorizer.tokenizer is not None or vectorizer.preprocessor is not None
+        or vectorizer.strip_accents is not None or vectorizer.binary
+        or vectorizer.norm not in ("l2", None) or not vectorizer.use_idf
+    )
+    if unsupported:
+        raise ValueError("Only word unigram TF-IDF vectorizers with l2 or no norm can be compiled")
+    terms = [None] * len(vectorizer.vocabulary_)
+    for term, column in vectorizer.vocabulary_.items():
+        terms[column] = term
+    meta = {
+        "token_pattern": vectorizer.token_pattern,
+        "lowercase": vectorizer.lowercase,
+        "norm": vectorizer.norm,
+        "sublinear_tf": vectorizer.sublinear_tf,
+    }
+    # Stop words never make it into the vocabulary, so dropping unknown
+    # tokens at transform time covers them too.
+    return meta, {"terms": np.array(terms), "idf": np.asarray(vectorizer.idf_, dtype=np.float64)}
+
+
+def _flatten_trees(trees):
+    # All trees share one set of node arrays; child pointers are offset so a
+    # whole ensemble can be walked in lockstep. Leaves keep -1 as their child.
+    left, right, feature, threshold, value, roots = [], [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        tree = tree.tree_
+        is_leaf = tree.children_left == -1
+        left.append(np.where(is_leaf, -1, tree.children_left + offset))
+        right.append(np.where(is_leaf, -1, tree.children_right + offset))
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(tree.threshold)
+        value.append(np.ascontiguousarray(tree.value[:, 0, :], dtype=np.float64))
+        roots.append(offset)
+        offset += tree.node_count
+    return {
+        "left": np.concatenate(left).astype(np.int64),
+        "right": np.concatenate(right).astype(np.int64),
+        "feature": np.concatenate(feature).astype(np.int64),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "value": np.concatenate(value),
+        "roots": np.asarray(roots, dtype=np.int64),
+    }
+
+
+def _tree_probabilities(values):
+    # Same normalisation as a fitted tree's predict_proba.
+    normalizer = values.sum(axis=1)[:, np.newaxis]
+    normalizer[normalizer == 0.0] = 1.0
+    return values / normalizer
+
+
+def _export_classifier(model):
+    name = type(model).__name__
+    if name in LINEAR_MODELS:
+        return "linear", {
+            "weights": np.ascontiguousarray(np.asarray(model.coef_, dtype=np.float64).T),
+            "intercept": np.asarray(model.intercept_, dtype=np.float64).ravel(),
+        }
+    if name in TREE_MODELS:
+        return "tree", _flatten_trees([model])
+    if name in FOREST_MODELS:
+        arrays = _flatten_trees(model.estimators_)
+        arrays["value"] = _tree_probabilities(arrays["value"])
+        return "forest", arrays
+    if name == "GradientBoostingClassifier":
+        # Trees are stored stage by stage, one per class within a stage. The
+        # initial raw score comes from the init estimator and does not depend on X.
+        arrays = _flatten_trees(model.estimators_.ravel())
+        arrays["init"] = np.asarray(model._raw_predict_init(np.zeros((1, model.n_features_in_))), dtype=np.float64)[0]
+        arrays["learning_rate"] = np.float64(model.learning_rate)
+        arrays["trees_per_stage"] = np.int64(model.estimators_.shape[1])
+        return "gradient_boosting", arrays
+    if name == "GaussianNB":
+        return "gaussian_nb", {
+            "log_prior": np.log(model.class_prior_),
+            "norm_const": np.array([-0.5 * np.sum(np.log(2.0 * np.pi * var)) for var in model.var_]),
+            "theta": np.asarray(model.theta_, dtype=np.float64),
+            "var": np.asarray(model.var_, dtype=np.float64),
+        }
+    raise ValueError(f"{name} cannot be compiled to the NumPy runtime; serve the pickled model instead")
+
+
+def export_model(model, vectorizer, path=RUNTIME_PATH, config=None):
+    vectorizer_meta, vectorizer_arrays = _export_vectorizer(vectorizer)
+    kind, model_arrays = _export_classifier(model)
+    meta = {"kind": kind, "vectorizer": vectorizer_meta, "training_config": config}
+    arrays = {f"vectorizer_{key}": array for key, array in vectorizer_arrays.items()}
+    arrays.update({f"model_{key}": array for key, array in model_arrays.items()})
+    # NumPy scalars (e.g. a searched n_estimators) are stored as plain numbers.
+    np.savez(path, meta=np.array(json.dumps(meta, default=lambda value: value.item())), classes=np.array(list(model.classes_)), **arrays)
+    return kind
+
+
+# -------------------- Runtime --------------------
+# Drop-in stand-ins for the fitted vectorizer and classifier: `transform`
+# returns dense float64 rows and `predict` returns class labels, matching
+# scikit-learn's output exactly (the arithmetic is done in the same order).
+class CompiledVectorizer:
+    def __init__(self, meta, terms, idf):
+        self.token_re = re.compile(meta["token_pattern"])
+        self.lowercase = meta["lowercase"]
+        self.norm = meta["norm"]
+        self.sublinear_tf = meta["sublinear_tf"]
+        self.vocabulary = {term: column for column, term in enumerate(terms.tolist())}
+        self.idf = idf
+
+    def transform(self, texts):
+        X = np.zeros((len(texts), len(self.idf)))
+        for row, text in enumerate(texts):
+            if self.lowercase:
+                text = text.lower()
+            for token in self.token_re.findall(text):
+                column = self.vocabulary.get(token)
+                if column is not None:
+                    X[row, column] += 1
+        if self.sublinear_tf:
+            counted = X > 0
+            X[counted] = np.log(X[counted]) + 1
+        X *= self.idf
+        if self.norm == "l2" and X.size:
+            # cumsum adds left to right, like the sparse row normaliser.
+            norms = np.sqrt(np.cumsum(X * X, axis=1)[:, -1])
+            norms[norms == 0.0] = 1.0
+            X /= norms[:, np.newaxis]
+        return X
+
+
+class CompiledModel:
+    def __init__(self, kind, classes, arrays, training_config=None):
+        self.kind = kind
+        self.training_config_ = training_config
+        self.classes_ = np.array(classes.tolist(), dtype=object)
+        for key, array in arrays.items():
+            setattr(self, key, array)
+
+    def _leaves(self, X):
+        # Walks every tree at once, one level per step, until all rows sit on
+        # a leaf. Trees split on float32 features, as in scikit-learn.
+        X = np.asarray(X, dtype=np.float32)
+        nodes = np.tile(self.roots, (len(X), 1))
+        rows = np.arange(len(X))[:, np.newaxis]
+        while True:
+            left = self.left[nodes]
+            inner = left != -1
+            if not inner.any():
+                return nodes
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(inner, np.where(go_left, left, self.right[nodes]), nodes)
+
+    def _linear_scores(self, X):
+        # Adds up each row's non-zero features in column order, which is how
+        # the sparse product in scikit-learn accumulates them.
+        nonzero = X != 0
+        width = int(nonzero.sum(axis=1).max()) if len(X) else 0
+        columns = np.argsort(~nonzero, axis=1, kind="stable")[:, :width]
+        values = np.take_along_axis(X, columns, axis=1)
+        scores = np.zeros((len(X), self.weights.shape[1]))
+        for slot in range(width):
+            scores += values[:, slot, np.newaxis] * self.weights[columns[:, slot]]
+        return scores + self.intercept
+
+    def decision_scores(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if self.kind == "linear":
+            return self._linear_scores(X)
+        if self.kind == "tree":
+            return self.value[self._leaves(X)[:, 0]]
+        if self.kind == "forest":
+            leaves = self._leaves(X)
+            proba = np.zeros((len(X), self.value.shape[1]))
+            for tree in range(leaves.shape[1]):
+                proba += self.value[leaves[:, tree]]
+            return proba / leaves.shape[1]
+        if self.kind == "gradient_boosting":
+            leaves = self._leaves(X)
+            per_stage = int(self.trees_per_stage)
+            raw = np.tile(self.init, (len(X), 1))
+            for stage in range(leaves.shape[1] // per_stage):
+                stage_leaves = leaves[:, stage * per_stage:(stage + 1) * per_stage]
+                raw += self.learning_rate * self.value[stage_leaves, 0]
+            return raw
+        if self.kind == "gaussian_nb":
+            return np.array([
+                self.log_prior[i] + (self.norm_const[i] - 0.5 * np.sum(((X - self.theta[i, :]) ** 2) / (self.var[i, :]), 1))
+                for i in range(len(self.classes_))
+            ]).T
+        raise ValueError(f"Unknown compiled model kind: {self.kind}")
+
+    def predict(self, X):
+        scores = self.decision_scores(X)
+        if scores.shape[1] == 1:
+            return self.classes_[(scores[:, 0] > 0).astype(int)]
+        return self.classes_[np.argmax(scores, axis=1)]
+
+
+def load_runtime(path=RUNTIME_PATH):
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data["meta"]))
+        vectorizer = CompiledVectorizer(meta["vectorizer"], data["vectorizer_terms"], data["vectorizer_idf"])
+        arrays = {key[len("model_"):]: data[key] for key in data.files if key.startswith("model_")}
+        model = CompiledModel(meta["kind"], data["classes"], arrays, meta.get("training_config"))
+    return vectorizer, model
@@ -0,0 +1,145 @@
+import argparse
+import os
+import signal
+import socketserver
+import sys
+import threading
+import time
+
+from catalogue import build_text_features, dedupe, fit_vectorizers, load_model, load_postings, prepare_changes
+from expiry import ExpiryIndex
+from model_client import (
+    MAX_K, MODEL_SERVER_ENV, OP_PREDICT, OP_TOP_K,
+    decode_request, encode_error, encode_results, read_frame, write_frame,
+)
+from posting_store import POSTINGS_DB, PostingStore
+from search_index import TfidfIndex
+
+DEFAULT_SOCKET = "/tmp/internship-model.sock"
+CATALOGUE_POLL_SECONDS = 30
+EXPIRY_PRUNE_SECONDS = 3600
+
+
+# -------------------- Recommendation Service --------------------
+# One copy of the model, its vectorizer and the retrieval indexes, shared by
+# every web worker through model_server.py instead of loaded in each of them.
+# Like app.py, it follows the posting store and drops expired postings.
+class RecommendationService:
+    def __init__(self):
+        started = time.perf_counter()
+        self.vectorizer, self.model = load_model()
+        frame, self.change_seq = load_postings()
+        frame = dedupe(frame)
+        if self.model is None or frame.empty:
+            raise SystemExit("⚠️ Model or catalogue missing; nothing to serve.")
+        frame["text_features"] = build_text_features(frame)
+        self.vectorizer, index_vectorizer = fit_vectorizers(frame, self.vectorizer)
+        self.search_index = TfidfIndex(index_vectorizer, frame["text_features"], frame["internship_id"])
+        self.expiry_index = ExpiryIndex(frame["internship_id"], frame["deadline"], frame["sector"])
+        self.size = len(frame)
+        print(f"🧠 Loaded {self.size} postings and {type(self.model).__name__} in {time.perf_counter() - started:.2f}s")
+
+    def predict(self, texts):
+        return list(self.model.predict(self.vectorizer.transform(texts)))
+
+    def top_k(self, texts, k):
+        # Same ranking as app.py: the predicted sector's live postings, most
+        # similar to what the user typed first.
+        return [
+            (sector, self.search_index.rank(text, self.expiry_index.live_ids(sector), limit=k))
+            for text, sector in zip(texts, self.predict(texts))
+        ]
+
+    def follow_posting_store(self):
+        last_seen = self.change_seq
+        while True:
+            time.sleep(CATALOGUE_POLL_SECONDS)
+            store = PostingStore(POSTINGS_DB)
+            try:
+                changes = store.changes_since(last_seen)
+            finally:
+                store.close()
+            if changes.empty:
+                continue
+            last_seen = int(changes["change_seq"].max())
+            live, changes = prepare_changes(changes)
+            self.search_index.delete(changes.loc[~changes.index.isin(live.index), "internship_id"])
+            self.search_index.add(live["internship_id"], live["text_features"])
+            self.expiry_index.remove(changes["internship_id"])
+            self.expiry_index.add(live["internship_id"], live["deadline"], live["sector"])
+            print(f"🔄 Catalogue updated: {len(live)} added/changed, {len(changes) - len(live)} removed")
+
+    def prune_expired(self):
+        while True:
+            expired = self.expiry_index.prune()
+            if len(expired):
+                self.search_index.delete(expired)
+                print(f"⌛ Pruned {len(expired)} expired postings")
+            time.sleep(EXPIRY_PRUNE_SECONDS)
+
+    def start_background_jobs(self):
+        if self.change_seq is not None:
+            threading.Thread(target=self.follow_posting_store, daemon=True).start()
+        threading.Thread(target=self.prune_expired, daemon=True).start()
+
+
+# -------------------- Socket Server --------------------
+# One thread per client connection; a connection serves requests until the
+# client closes it, so each web worker thread pays for connecting once.
+class RequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        service = self.server.service
+        while True:
+            try:
+                body = read_frame(self.request)
+            except ConnectionError:
+                return
+            if body is None:
+                return
+            try:
+                op, k, texts = decode_request(body)
+                if op == OP_PREDICT:
+                    response = encode_results([(sector, []) for sector in service.predict(texts)])
+                elif op == OP_TOP_K:
+                    response = encode_results(service.top_k(texts, min(k, MAX_K)))
+                else:
+                    response = encode_error(f"unknown op {op}")
+            except Exception as e:
+                response = encode_error(f"{type(e).__name__}: {e}")
+            try:
+                write_frame(self.request, response)
+            except OSError:
+                return
+
+
+class ModelServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, service):
+        if os.path.exists(path):
+            os.unlink(path)  # left behind by a previous run
+        super().__init__(path, RequestHandler)
+        self.service = service
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recommendations to the web workers over a Unix socket.")
+    parser.add_argument("--socket", default=os.environ.get(MODEL_SERVER_ENV, DEFAULT_SOCKET), help="socket path to listen on")
+    args = parser.parse_args()
+
+    service = RecommendationService()
+    service.start_background_jobs()
+    # Exit through the cleanup below on a plain `kill` too, not just Ctrl-C.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    with ModelServer(args.socket, service) as server:
+        print(f"✅ Model server listening on {args.socket} (point {MODEL_SERVER_ENV} at it)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
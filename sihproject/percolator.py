@@ -0,0 +1,150 @@
+import random
+import time
+from collections import defaultdict
+
+# -------------------- Matching Rules --------------------
+# Education levels offered on the predict form, mapped to the
+# `education_required` values in the catalogue that they satisfy.
+EDUCATION_LEVELS = {
+    "School": {"10+2"},
+    "College": {"10+2", "Diploma", "Graduate"},
+    "Post Graduation": {"10+2", "Diploma", "Graduate", "Post-Graduate"},
+}
+WILDCARDS = {"", "any"}
+ANY = ""
+REMOTE = "remote"
+
+
+def _norm(value):
+    return str(value or "").strip().lower()
+
+
+def _skill_tokens(skills):
+    if isinstance(skills, str):
+        skills = skills.split(",")
+    return {_norm(skill) for skill in skills or [] if _norm(skill)}
+
+
+# -------------------- Preference Index --------------------
+# Reverse ("percolator") matching: instead of scanning every user for each new
+# posting, saved preferences are bucketed by their (sector, location,
+# education) choice and indexed by skill inside each bucket. A posting only
+# visits the few buckets it is compatible with, and every user it reaches
+# there is a match, so the work grows with the number of matches rather than
+# with the number of users.
+
+
+class _Bucket:
+    def __init__(self):
+        self.by_skill = defaultdict(set)
+        self.any_skill = set()
+
+    def __bool__(self):
+        return bool(self.any_skill) or any(self.by_skill.values())
+
+
+class PreferenceIndex:
+    def __init__(self):
+        self.buckets = {}
+        self.locations = set()
+        self.users = {}
+
+    def __len__(self):
+        return len(self.users)
+
+    def add_user(self, user_id, education, skills, sector, location):
+        self.remove_user(user_id)
+        sector = ANY if _norm(sector) in WILDCARDS else _norm(sector)
+        location = ANY if _norm(location) in WILDCARDS else _norm(location)
+        level = str(education or "").strip()
+        level = level if level in EDUCATION_LEVELS else ANY
+        skill_set = _skill_tokens(skills)
+
+        key = (sector, location, level)
+        bucket = self.buckets.setdefault(key, _Bucket())
+        if skill_set:
+            for skill in skill_set:
+                bucket.by_skill[skill].add(user_id)
+        else:
+            bucket.any_skill.add(user_id)
+        self.locations.add(location)
+        self.users[user_id] = (key, skill_set)
+
+    def remove_user(self, user_id):
+        entry = self.users.pop(user_id, None)
+        if entry is None:
+            return
+        key, skill_set = entry
+        bucket = self.buckets[key]
+        for skill in skill_set:
+            bucket.by_skill[skill].discard(user_id)
+            if not bucket.by_skill[skill]:
+                del bucket.by_skill[skill]
+        bucket.any_skill.discard(user_id)
+        if not bucket:
+            del self.buckets[key]
+
+    def match(self, posting):
+        sector = _norm(posting.get("sector"))
+        location = _norm(posting.get("location"))
+        education = str(posting.get("education_required") or "").strip()
+        skills = _skill_tokens(posting.get("required_skills"))
+
+        levels = [level for level, accepted in EDUCATION_LEVELS.items() if education in accepted] + [ANY]
+        # Remote postings suit everyone regardless of their preferred city.
+        locations = self.locations if location == REMOTE else (location, ANY)
+
+        matched = set()
+        for user_sector in (sector, ANY):
+            for user_location in locations:
+                for level in levels:
+                    bucket = self.buckets.get((user_sector, user_location, level))
+                    if bucket is None:
+                        continue
+                    matched |= bucket.any_skill
+                    for skill in skills:
+                        matched |= bucket.by_skill.get(skill, set())
+        return matched
+
+    def match_batch(self, postings):
+        return [
+            (user_id, posting["internship_id"])
+            for posting in postings
+            for user_id in self.match(posting)
+        ]
+
+
+# -------------------- Throughput Benchmark --------------------
+def _synthetic_users(count, seed=7):
+    rng = random.Random(seed)
+    sectors = ["IT", "Finance", "Management", "Education", "Health", "Law", "Design", "Engineering", "Agriculture", "Social Work"]
+    cities = ["Delhi", "Mumbai", "Bangalore", "Chennai", "Kolkata", "Hyderabad", "Nagpur", "Lucknow", "Bhopal", "Remote"]
+    skills = ["Python", "SQL", "Excel", "Communication", "Java", "HTML", "CSS", "Leadership", "MS Office", "Data Analysis",
+              "Illustrator", "Research", "Writing", "Accounting", "Marketing", "Teaching", "Law", "AutoCAD"]
+    levels = list(EDUCATION_LEVELS) + ["Any"]
+    for user_id in range(count):
+        yield (user_id, rng.choice(levels), ", ".join(rng.sample(skills, rng.randint(1, 4))),
+               rng.choice(sectors + [""]), rng.choice(cities + [""]))
+
+
+if __name__ == "__main__":
+    import ast
+
+    import pandas as pd
+
+    postings = pd.read_csv("internships.csv")
+    postings["required_skills"] = postings["required_skills"].apply(ast.literal_eval)
+    batch = postings.to_dict("records")
+
+    for user_count in (10_000, 100_000, 1_000_000):
+        index = PreferenceIndex()
+        started = time.perf_counter()
+        for user in _synthetic_users(user_count):
+            index.add_user(*user)
+        build_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        events = index.match_batch(batch)
+        match_s = time.perf_counter() - started
+        print(f"👥 {user_count:>9} users: index built in {build_s:.2f}s, {len(batch)} postings -> "
+              f"{len(events)} matches in {match_s * 1000:.1f} ms ({len(batch) / match_s:.0f} postings/s)")
@@ -0,0 +1,184 @@
+import sqlite3
+import time
+
+import pandas as pd
+
+POSTINGS_DB = "postings.db"
+
+POSTING_COLUMNS = [
+    "internship_id", "title", "sector", "required_skills", "education_required",
+    "location", "duration", "stipend", "deadline",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posting (
+    internship_id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    external_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    sector TEXT,
+    required_skills TEXT,
+    education_required TEXT,
+    location TEXT,
+    duration TEXT,
+    stipend INTEGER,
+    deadline TEXT,
+    cluster_id INTEGER,
+    removed INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    change_seq INTEGER,
+    UNIQUE (source, external_id)
+);
+CREATE INDEX IF NOT EXISTS ix_posting_updated_at ON posting (updated_at);
+CREATE TABLE IF NOT EXISTS source_state (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL
+);
+"""
+
+# Every write stamps the row with the next change sequence number, computed
+# inside the writing transaction. SQLite runs one write transaction at a time,
+# so numbers only ever grow in commit order and a poller that has seen up to N
+# can never miss a later commit. updated_at, a wall-clock time taken by the
+# writer, gives no such guarantee: a fetch stamps a whole response before it
+# starts streaming it, and concurrent fetches commit out of order.
+NEXT_CHANGE_SEQ = "(SELECT COALESCE(MAX(change_seq), 0) + 1 FROM posting)"
+
+UPSERT = f"""
+INSERT INTO posting (source, external_id, title, sector, required_skills, education_required,
+                     location, duration, stipend, deadline, removed, updated_at, change_seq)
+VALUES (:source, :external_id, :title, :sector, :required_skills, :education_required,
+        :location, :duration, :stipend, :deadline, :removed, :updated_at, {NEXT_CHANGE_SEQ})
+ON CONFLICT (source, external_id) DO UPDATE SET
+    title = excluded.title,
+    sector = excluded.sector,
+    required_skills = excluded.required_skills,
+    education_required = excluded.education_required,
+    location = excluded.location,
+    duration = excluded.duration,
+    stipend = excluded.stipend,
+    deadline = excluded.deadline,
+    removed = excluded.removed,
+    updated_at = excluded.updated_at,
+    change_seq = excluded.change_seq
+WHERE posting.title IS NOT excluded.title
+   OR posting.sector IS NOT excluded.sector
+   OR posting.required_skills IS NOT excluded.required_skills
+   OR posting.education_required IS NOT excluded.education_required
+   OR posting.location IS NOT excluded.location
+   OR posting.duration IS NOT excluded.duration
+   OR posting.stipend IS NOT excluded.stipend
+   OR posting.deadline IS NOT excluded.deadline
+   OR posting.removed IS NOT excluded.removed
+"""
+
+
+# -------------------- Posting Store --------------------
+# SQLite-backed catalogue that the ingestion pipeline upserts into. Rows from
+# internships.csv are seeded under the "csv" source with their original ids,
+# so existing internship_id references stay valid.
+class PostingStore:
+    def __init__(self, path=POSTINGS_DB, check_same_thread=True):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=check_same_thread)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._add_change_seq()
+
+    def _add_change_seq(self):
+        # Stores created before change_seq existed are numbered in the order
+        # their rows were last updated.
+        columns = [row["name"] for row in self.conn.execute("PRAGMA table_info(posting)")]
+        with self.conn:
+            if "change_seq" not in columns:
+                self.conn.execute("ALTER TABLE posting ADD COLUMN change_seq INTEGER")
+                ids = self.conn.execute("SELECT internship_id FROM posting ORDER BY updated_at, internship_id").fetchall()
+                self.conn.executemany(
+                    "UPDATE posting SET change_seq = ? WHERE internship_id = ?",
+                    [(seq, row["internship_id"]) for seq, row in enumerate(ids, start=1)],
+                )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS ix_posting_change_seq ON posting (change_seq)")
+
+    def close(self):
+        self.conn.close()
+
+    def is_empty(self):
+        return self.conn.execute("SELECT 1 FROM posting LIMIT 1").fetchone() is None
+
+    def seed_from_csv(self, csv_path):
+        seed = pd.read_csv(csv_path)
+        now = time.time()
+        # Each seeded posting starts as its own cluster, which is what the first
+        # refresh_clusters() assigns to all but the duplicates; with NULL it
+        # would give every row a new change_seq and running apps would re-apply
+        # the whole catalogue.
+        rows = [
+            dict(record, source="csv", external_id=str(record["internship_id"]), removed=0, updated_at=now)
+            for record in seed[POSTING_COLUMNS].to_dict("records")
+        ]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO posting (internship_id, source, external_id, title, sector, required_skills, "
+                "education_required, location, duration, stipend, deadline, removed, updated_at, cluster_id, change_seq) "
+                "VALUES (:internship_id, :source, :external_id, :title, :sector, :required_skills, :education_required, "
+                f":location, :duration, :stipend, :deadline, :removed, :updated_at, :internship_id, {NEXT_CHANGE_SEQ})",
+                rows,
+            )
+        return len(rows)
+
+    def upsert_many(self, records):
+        # Unchanged rows are skipped by the WHERE clause, so re-ingesting a
+        # source only touches updated_at for postings that actually changed.
+        if not records:
+            return 0
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(UPSERT, records)
+            return self.conn.total_changes - before
+
+    def load_dataframe(self, include_removed=False):
+        query = f"SELECT {', '.join(POSTING_COLUMNS)} FROM posting"
+        if not include_removed:
+            query += " WHERE removed = 0"
+        return pd.read_sql_query(query + " ORDER BY internship_id", self.conn)
+
+    def last_change(self):
+        # Read before load_dataframe(), so anything committed in between is
+        # picked up by the first changes_since() call.
+        return self.conn.execute("SELECT COALESCE(MAX(change_seq), 0) FROM posting").fetchone()[0]
+
+    def changes_since(self, change_seq):
+        query = (f"SELECT {', '.join(POSTING_COLUMNS)}, cluster_id, removed, updated_at, change_seq "
+                 "FROM posting WHERE change_seq > ?")
+        return pd.read_sql_query(query + " ORDER BY change_seq", self.conn, params=(change_seq,))
+
+    def assign_clusters(self, clustered):
+        # Only rows whose cluster actually changed get a new change_seq, so
+        # running apps pick up the reassignment on their next poll.
+        now = time.time()
+        rows = [
+            (cluster_id, now, internship_id, cluster_id)
+            for cluster_id, internship_id in zip(clustered["cluster_id"].astype(int), clustered["internship_id"].astype(int))
+        ]
+        with self.conn:
+            self.conn.executemany(
+                f"UPDATE posting SET cluster_id = ?, updated_at = ?, change_seq = {NEXT_CHANGE_SEQ} "
+                "WHERE internship_id = ? AND cluster_id IS NOT ?", rows
+            )
+
+    # -------------------- Conditional Fetch State --------------------
+    def get_validators(self, url):
+        row = self.conn.execute("SELECT etag, last_modified FROM source_state WHERE url = ?", (url,)).fetchone()
+        return (row["etag"], row["last_modified"]) if row else (None, None)
+
+    def set_validators(self, url, etag, last_modified):
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO source_state (url, etag, last_modified, fetched_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (url) DO UPDATE SET etag = excluded.etag, last_modified = excluded.last_modified, "
+                "fetched_at = excluded.fetched_at",
+                (url, etag, last_modified, time.time()),
+            )
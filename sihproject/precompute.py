@@ -0,0 +1,58 @@
+import hashlib
+
+import numpy as np
+
+# -------------------- Precomputed Recommendations --------------------
+# Offline scoring of every user with saved preferences, run by
+# `flask --app app precompute-recommendations`. Each user's list is stamped
+# with a fingerprint of the preferences and the catalogue version it was
+# scored against; predict() serves it while both still match.
+TOP_N = 5  # one swipe deck, as in predict()
+# More than one deck is stored, so a list still has TOP_N unseen postings left
+# after the user has swiped through the first few.
+STORED_N = 4 * TOP_N
+CHUNK_USERS = 2048
+
+
+def preference_text(education, skills, sector, location):
+    # Must match the text predict() builds from the form.
+    return f"{sector} {skills} {education} {location}"
+
+
+def preferences_fingerprint(education, skills, sector, location):
+    values = (education, skills, sector, location)
+    return hashlib.sha1("\x1f".join(str(value or "") for value in values).encode("utf-8")).hexdigest()
+
+
+def score_chunk(texts, model, vectorizer, index_vectorizer, matrix, ids, live_rows, top_n=STORED_N):
+    # Same ranking as predict(): the predicted sector's live postings (in
+    # deadline order) sorted by cosine similarity, stable on ties. Users are
+    # scored one sector at a time with a single sparse product per sector,
+    # written as postings @ queries so each score is summed exactly as
+    # TfidfIndex.rank sums it.
+    sectors = np.asarray(model.predict(vectorizer.transform(texts)), dtype=object)
+    queries = index_vectorizer.transform(texts)
+    results = [None] * len(texts)
+    for sector in set(sectors):
+        users = np.flatnonzero(sectors == sector)
+        rows = live_rows.get(sector, np.empty(0, dtype=np.int64))
+        if not len(rows):
+            for user in users:
+                results[user] = (sector, [])
+            continue
+        scores = (matrix[rows] @ queries[users].T).toarray().T
+        order = np.argsort(-scores, axis=1, kind="stable")[:, :top_n]
+        for user, picked in zip(users, order):
+            results[user] = (sector, ids[rows[picked]].tolist())
+    return results
+
+
+def score_users(texts, model, vectorizer, index_vectorizer, matrix, ids, live_rows, n_jobs=-1, chunk_size=CHUNK_USERS):
+    # Chunks are scored in parallel worker processes.
+    from joblib import Parallel, delayed
+
+    chunks = [texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+    scored = Parallel(n_jobs=n_jobs)(
+        delayed(score_chunk)(chunk, model, vectorizer, index_vectorizer, matrix, ids, live_rows) for chunk in chunks
+    )
+    return [result for chunk in scored for result in chunk]
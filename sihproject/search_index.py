@@ -0,0 +1,158 @@
+import threading
+import time
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.base import clone
+
+# -------------------- Index Settings --------------------
+# Share of tokens in appended postings that the fitted vocabulary has never
+# seen; past this point the idf weights are stale enough to warrant a refit.
+DRIFT_THRESHOLD = 0.2
+# Deleted rows are only tombstoned, so the matrix is also rebuilt once they
+# make up this share of it.
+TOMBSTONE_THRESHOLD = 0.3
+
+
+# -------------------- Incremental TF-IDF Index --------------------
+class TfidfIndex:
+    def __init__(self, vectorizer, texts, ids, drift_threshold=DRIFT_THRESHOLD,
+                 tombstone_threshold=TOMBSTONE_THRESHOLD):
+        # `vectorizer` must already be fitted. A refit swaps in a fresh clone, so
+        # the caller's object (and any model trained on its features) is untouched.
+        self.vectorizer = vectorizer
+        self.drift_threshold = drift_threshold
+        self.tombstone_threshold = tombstone_threshold
+        self.lock = threading.RLock()
+        self.refitting = False
+        self.last_refit = None
+        self._reset(vectorizer, vectorizer.transform(list(texts)), list(texts), list(ids))
+
+    def _reset(self, vectorizer, matrix, texts, ids):
+        self.vectorizer = vectorizer
+        self._analyzer = vectorizer.build_analyzer()
+        self._blocks = [sp.csr_matrix(matrix)]
+        self._matrix = self._blocks[0]
+        self.texts = texts
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.alive = np.ones(len(ids), dtype=bool)
+        self.row_of = {int(i): row for row, i in enumerate(ids)}
+        self.added_tokens = 0
+        self.unknown_tokens = 0
+
+    # -------------------- Reads --------------------
+    @property
+    def matrix(self):
+        # Appended blocks are stacked lazily, once per batch of reads, instead
+        # of copying the whole matrix on every add.
+        with self.lock:
+            if len(self._blocks) > 1:
+                self._matrix = sp.vstack(self._blocks, format="csr")
+                self._blocks = [self._matrix]
+            return self._matrix
+
+    def __len__(self):
+        return int(self.alive.sum())
+
+    def drift(self):
+        return self.unknown_tokens / self.added_tokens if self.added_tokens else 0.0
+
+    def tombstone_ratio(self):
+        return 1.0 - self.alive.mean() if len(self.alive) else 0.0
+
+    def rank(self, text, ids, limit=None):
+        # Orders the given posting ids by cosine similarity to `text`. Rows are
+        # l2-normalised by the vectorizer, so a dot product is the cosine.
+        with self.lock:
+            rows = np.array([self.row_of[int(i)] for i in ids if int(i) in self.row_of], dtype=np.int64)
+            if not len(rows):
+                return []
+            query = self.vectorizer.transform([text])
+            scores = (self.matrix[rows] @ query.T).toarray().ravel()
+            order = np.argsort(-scores, kind="stable")
+            if limit is not None:
+                order = order[:limit]
+            return self.ids[rows[order]].tolist()
+
+    # -------------------- Writes --------------------
+    def add(self, ids, texts):
+        ids, texts = list(ids), list(texts)
+        if not ids:
+            return
+        vocabulary = self.vectorizer.vocabulary_
+        with self.lock:
+            # Updated postings are appended as new rows; their old rows become tombstones.
+            self._tombstone(ids)
+            block = self.vectorizer.transform(texts)
+            for text in texts:
+                tokens = self._analyzer(text)
+                self.added_tokens += len(tokens)
+                self.unknown_tokens += sum(1 for token in tokens if token not in vocabulary)
+
+            start = len(self.ids)
+            self._blocks.append(sp.csr_matrix(block))
+            self.texts.extend(texts)
+            self.ids = np.concatenate([self.ids, np.asarray(ids, dtype=np.int64)])
+            self.alive = np.concatenate([self.alive, np.ones(len(ids), dtype=bool)])
+            for offset, posting_id in enumerate(ids):
+                self.row_of[int(posting_id)] = start + offset
+        self.maybe_refit()
+
+    def delete(self, ids):
+        with self.lock:
+            self._tombstone(ids)
+        self.maybe_refit()
+
+    def _tombstone(self, ids):
+        for posting_id in ids:
+            row = self.row_of.pop(int(posting_id), None)
+            if row is not None:
+                self.alive[row] = False
+
+    # -------------------- Background Refit --------------------
+    def needs_refit(self):
+        return self.drift() > self.drift_threshold or self.tombstone_ratio() > self.tombstone_threshold
+
+    def maybe_refit(self):
+        with self.lock:
+            if self.refitting or not self.needs_refit():
+                return False
+            self.refitting = True
+        threading.Thread(target=self._refit, daemon=True).start()
+        return True
+
+    def _refit(self):
+        try:
+            with self.lock:
+                live = np.flatnonzero(self.alive)
+                texts = [self.texts[row] for row in live]
+                ids = self.ids[live].tolist()
+                snapshot_size = len(self.ids)
+            if not texts:
+                return
+            started = time.perf_counter()
+            vectorizer = clone(self.vectorizer).fit(texts)
+            matrix = vectorizer.transform(texts)
+
+            with self.lock:
+                # Rows added or deleted while the refit ran are replayed on top
+                # of the fresh matrix before it is swapped in.
+                keep = [k for k, row in enumerate(live) if self.alive[row]]
+                late_rows = [row for row in range(snapshot_size, len(self.ids)) if self.alive[row]]
+                late_ids = self.ids[late_rows].tolist()
+                late_texts = [self.texts[row] for row in late_rows]
+
+                self._reset(vectorizer, matrix[keep], [texts[k] for k in keep], [ids[k] for k in keep])
+                if late_ids:
+                    self._blocks.append(sp.csr_matrix(vectorizer.transform(late_texts)))
+                    start = len(self.ids)
+                    self.texts.extend(late_texts)
+                    self.ids = np.concatenate([self.ids, np.asarray(late_ids, dtype=np.int64)])
+                    self.alive = np.ones(len(self.ids), dtype=bool)
+                    for offset, posting_id in enumerate(late_ids):
+                        self.row_of[int(posting_id)] = start + offset
+                self.last_refit = {"rows": len(self.ids), "seconds": time.perf_counter() - started}
+            print(f"🔁 TF-IDF index refit on {len(self.ids)} postings in {self.last_refit['seconds']:.2f}s")
+        finally:
+            with self.lock:
+                self.refitting = False
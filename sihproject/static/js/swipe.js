@@ -0,0 +1,160 @@
+document.addEventListener('DOMContentLoaded', () => {
+    const card = document.getElementById('swipeCard');
+    if (!card) return;
+
+    const deck = document.getElementById('swipeDeck');
+    const likeForm = document.getElementById('likeForm');
+    const dislikeForm = document.getElementById('dislikeForm');
+    const likeLabel = document.getElementById('likeLabel');
+    const nopeLabel = document.getElementById('nopeLabel');
+
+    let isDragging = false;
+    let startX = 0;
+    let currentX = 0;
+    const swipeThreshold = 75;
+
+    // --- Prefetched cards and batched swipe events ---
+    // Upcoming cards are fetched as JSON ahead of time and swipes are
+    // posted in batches, so the page is never reloaded between cards.
+    const PREFETCH_COUNT = 3;
+    const SWIPE_BATCH_SIZE = 5;
+    const SWIPE_FLUSH_MS = 5000;
+    // Apps without the JSON card API (app1.py, app2.py) post each swipe's form.
+    const swipeApi = Boolean(deck.dataset.cardsUrl);
+    const buffer = [];
+    let pendingSwipes = [];
+    let exhausted = false;
+    let fetching = null;
+
+    const prefetch = () => {
+        if (fetching || exhausted || buffer.length >= PREFETCH_COUNT) return fetching;
+        fetching = fetch(`${deck.dataset.cardsUrl}?n=${PREFETCH_COUNT}`, { credentials: 'same-origin' })
+            .then((response) => response.json())
+            .then((data) => {
+                buffer.push(...data.cards);
+                exhausted = data.remaining === 0;
+            })
+            .catch(() => { exhausted = true; })
+            .finally(() => { fetching = null; });
+        return fetching;
+    };
+
+    const flushSwipes = (useBeacon = false) => {
+        if (!pendingSwipes.length) return;
+        const body = JSON.stringify({ swipes: pendingSwipes });
+        pendingSwipes = [];
+        if (useBeacon && navigator.sendBeacon) {
+            navigator.sendBeacon(deck.dataset.swipesUrl, new Blob([body], { type: 'application/json' }));
+        } else {
+            fetch(deck.dataset.swipesUrl, {
+                method: 'POST',
+                credentials: 'same-origin',
+                keepalive: true,
+                headers: { 'Content-Type': 'application/json' },
+                body,
+            });
+        }
+    };
+
+    const showCard = (rec) => {
+        card.dataset.id = rec.internship_id;
+        card.querySelectorAll('[data-field]').forEach((el) => {
+            el.textContent = rec[el.dataset.field];
+        });
+        card.style.transition = 'none';
+        card.style.transform = 'translateX(0) rotate(0)';
+    };
+
+    const showNext = async () => {
+        if (!buffer.length && !exhausted) await prefetch();
+        const next = buffer.shift();
+        if (next) {
+            showCard(next);
+            prefetch();
+        } else {
+            card.style.display = 'none';
+            document.getElementById('swipeActions').style.display = 'none';
+            document.getElementById('noMoreRecs').style.display = '';
+            flushSwipes();
+        }
+    };
+
+    const swipe = (action) => {
+        card.style.transition = 'transform 0.3s ease-in-out';
+        card.style.transform = action === 'like'
+            ? 'translateX(500px) rotate(30deg)'
+            : 'translateX(-500px) rotate(-30deg)';
+        if (!swipeApi) {
+            setTimeout(() => (action === 'like' ? likeForm : dislikeForm).submit(), 300);
+            return;
+        }
+        pendingSwipes.push({ internship_id: Number(card.dataset.id), action });
+        if (pendingSwipes.length >= SWIPE_BATCH_SIZE) flushSwipes();
+        setTimeout(showNext, 300);
+    };
+
+    likeForm.addEventListener('submit', (e) => { e.preventDefault(); swipe('like'); });
+    dislikeForm.addEventListener('submit', (e) => { e.preventDefault(); swipe('nope'); });
+    if (swipeApi) {
+        setInterval(flushSwipes, SWIPE_FLUSH_MS);
+        window.addEventListener('pagehide', () => flushSwipes(true));
+        prefetch();
+    }
+
+    const handleStart = (e) => {
+        isDragging = true;
+        startX = e.type.startsWith('touch') ? e.touches[0].clientX : e.clientX;
+        card.classList.add('swiping');
+        card.style.transition = 'none'; // Disable CSS transition during drag
+    };
+
+    const handleMove = (e) => {
+        if (!isDragging) return;
+        currentX = e.type.startsWith('touch') ? e.touches[0].clientX : e.clientX;
+        const deltaX = currentX - startX;
+        const rotate = deltaX / 10;
+
+        card.style.transform = `translateX(${deltaX}px) rotate(${rotate}deg)`;
+
+        const opacity = Math.min(Math.abs(deltaX) / swipeThreshold, 1.5);
+        if (deltaX > 0) {
+            likeLabel.style.opacity = opacity;
+            nopeLabel.style.opacity = 0;
+        } else {
+            nopeLabel.style.opacity = opacity;
+            likeLabel.style.opacity = 0;
+        }
+    };
+
+    const handleEnd = (e) => {
+        if (!isDragging) return;
+        isDragging = false;
+        card.classList.remove('swiping');
+        card.style.transition = 'transform 0.3s ease-in-out'; // Re-enable CSS transition
+
+        const finalX = e.type.startsWith('touch') ? e.changedTouches[0].clientX : e.clientX;
+        const deltaX = finalX - startX;
+
+        if (deltaX > swipeThreshold) {
+            swipe('like');
+        } else if (deltaX < -swipeThreshold) {
+            swipe('nope');
+        } else {
+            card.style.transform = `translateX(0) rotate(0)`;
+        }
+
+        likeLabel.style.opacity = 0;
+        nopeLabel.style.opacity = 0;
+    };
+
+    // Event listeners
+    card.addEventListener('mousedown', handleStart);
+    document.addEventListener('mousemove', handleMove); // Listen on document for better drag
+    document.addEventListener('mouseup', handleEnd);
+
+    card.addEventListener('touchstart', (e) => handleStart(e));
+    document.addEventListener('touchmove', (e) => handleMove(e));
+    document.addEventListener('touchend', (e) => handleEnd(e));
+
+    card.addEventListener('dragstart', (e) => e.preventDefault());
+});
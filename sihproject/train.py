@@ -1,8 +1,18 @@
 # internship_model_training.py
 
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import time
+import joblib
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
+import sklearn
+from sklearn.base import clone
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import train_test_split, HalvingGridSearchCV
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics import accuracy_score, classification_report
 from sklearn.linear_model import LogisticRegression
@@ -11,88 +21,179 @@ from sklearn.tree import DecisionTreeClassifier
 from sklearn.naive_bayes import GaussianNB
 from sklearn.svm import SVC
 import pickle
-
-# -----------------------------
-# STEP 1: Load Data
-# -----------------------------
-df = pd.read_csv("internships.csv")
-
-# Convert skills list into string if needed
-df["required_skills"] = df["required_skills"].astype(str)
-
-# -----------------------------
-# STEP 2: Feature Engineering
-# -----------------------------
-# Combine internship fields into text
-df["text_features"] = (
-    df["title"].astype(str) + " " +
-    df["sector"].astype(str) + " " +
-    df["required_skills"].astype(str) + " " +
-    df["education_required"].astype(str) + " " +
-    df["location"].astype(str)
-)
-
-# Vectorize text
-vectorizer = TfidfVectorizer(stop_words="english", max_features=1000)
-X = vectorizer.fit_transform(df["text_features"])
-
-# ⚠️ NOTE: You don’t have real labels (y) → for demo, we simulate
-# Example: predict "sector" as a classification problem
-y = df["sector"]
-
-# -----------------------------
-# STEP 3: Train/Test Split
-# -----------------------------
-x_train, x_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
+from model_runtime import RUNTIME_PATH, export_model, load_runtime
+
+parser = argparse.ArgumentParser(description="Train the sector classifier and save the best model.")
+parser.add_argument("--search", action="store_true", help="tune hyperparameters by successive halving")
+parser.add_argument("--cv", type=int, default=5, help="cross-validation folds used by the search")
+parser.add_argument("--time-budget", type=float, default=None, help="seconds after which no new search is started (one already running finishes); remaining models use defaults")
+parser.add_argument("--no-cache", action="store_true", help="featurise from scratch even if a cached copy exists")
+args = parser.parse_args()
+
+DATA_PATH = "internships.csv"
+LABEL_COLUMN = "sector"
+SPLIT = {"test_size": 0.2, "random_state": 42}
+FEATURE_CACHE_DIR = "feature_cache"
+
+
+def featurise():
+    # -----------------------------
+    # STEP 1: Load Data
+    # -----------------------------
+    df = pd.read_csv(DATA_PATH)
+
+    # Convert skills list into string if needed
+    df["required_skills"] = df["required_skills"].astype(str)
+
+    # -----------------------------
+    # STEP 2: Feature Engineering
+    # -----------------------------
+    # Combine internship fields into text
+    df["text_features"] = (
+        df["title"].astype(str) + " " +
+        df["sector"].astype(str) + " " +
+        df["required_skills"].astype(str) + " " +
+        df["education_required"].astype(str) + " " +
+        df["location"].astype(str)
+    )
+
+    # Vectorize text
+    vectorizer = make_vectorizer()
+    X = vectorizer.fit_transform(df["text_features"])
+
+    # ⚠️ NOTE: You don’t have real labels (y) → for demo, we simulate
+    # Example: predict "sector" as a classification problem
+    y = df[LABEL_COLUMN]
+
+    # -----------------------------
+    # STEP 3: Train/Test Split
+    # -----------------------------
+    x_train, x_test, y_train, y_test = train_test_split(X, y, **SPLIT)
+
+    return {
+        "vectorizer": vectorizer,
+        "texts": df["text_features"].tolist(),
+        "x_train": x_train, "x_test": x_test,
+        "y_train": y_train, "y_test": y_test,
+    }
+
+
+def make_vectorizer():
+    return TfidfVectorizer(stop_words="english", max_features=1000)
+
+
+# Featurisation is cached on disk, keyed by the dataset's bytes, the code in
+# `featurise` and every setting that shapes the features. Iterating on models
+# skips it entirely; any change to the data or the featuriser gets a new entry.
+def feature_cache_key():
+    digest = hashlib.sha256()
+    with open(DATA_PATH, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    settings = {
+        "featurise": inspect.getsource(featurise),
+        "label": LABEL_COLUMN,
+        "split": SPLIT,
+        "vectorizer": make_vectorizer().get_params(),
+        "sklearn": sklearn.__version__,
+    }
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def load_features():
+    path = os.path.join(FEATURE_CACHE_DIR, f"{feature_cache_key()}.joblib")
+    if not args.no_cache and os.path.exists(path):
+        print(f"📦 Loaded cached features from {path}")
+        return joblib.load(path)
+    started = time.monotonic()
+    features = featurise()
+    os.makedirs(FEATURE_CACHE_DIR, exist_ok=True)
+    joblib.dump(features, path)
+    print(f"📦 Featurised in {time.monotonic() - started:.2f}s, cached as {path}")
+    return features
+
+
+features = load_features()
+vectorizer = features["vectorizer"]
+x_train, x_test = features["x_train"], features["x_test"]
+y_train, y_test = features["y_train"], features["y_test"]
+
+# Models that need dense input share one densified copy, made on first use.
+# (With n_jobs=-1 joblib memory-maps it into the search workers too.)
+dense_views = {}
+
+def dense(name, matrix):
+    if name not in dense_views:
+        dense_views[name] = matrix.toarray()
+    return dense_views[name]
 
 # -----------------------------
 # STEP 4: Train Multiple Models
 # -----------------------------
-results = []
+# With --search each model's hyperparameters are tuned by successive halving:
+# every configuration is cross-validated on a small budget (few training rows,
+# or few trees for the ensembles) and only the best third moves on to the next
+# round with three times the budget. Models are searched cheapest first; once
+# --time-budget is spent, the rest are trained with their defaults.
+#
+# (name, estimator, needs dense input, search grid, halving resource)
+MODELS = [
+    ("Naive Bayes", GaussianNB(), True,
+     {"var_smoothing": [1e-11, 1e-10, 1e-9, 1e-8, 1e-7, 1e-6, 1e-5]}, "n_samples"),
+    ("Logistic Regression", LogisticRegression(max_iter=500), False,
+     {"C": [0.1, 0.3, 1, 3, 10, 30, 100], "class_weight": [None, "balanced"]}, "n_samples"),
+    ("Decision Tree", DecisionTreeClassifier(), False,
+     {"criterion": ["gini", "entropy"], "max_depth": [None, 10, 20, 40], "min_samples_leaf": [1, 2, 4]}, "n_samples"),
+    ("SVM", SVC(), False,
+     {"kernel": ["linear", "rbf"], "C": [0.3, 1, 3, 10, 30], "gamma": ["scale", 0.1, 1]}, "n_samples"),
+    ("Random Forest", RandomForestClassifier(), False,
+     {"max_features": ["sqrt", "log2", 0.1], "max_depth": [None, 20], "min_samples_leaf": [1, 2]}, "n_estimators"),
+    ("Gradient Boosting", GradientBoostingClassifier(), True,
+     {"learning_rate": [0.03, 0.1, 0.3], "max_depth": [2, 3, 5], "subsample": [0.8, 1.0]}, "n_estimators"),
+]
+# Tree counts the ensembles are grown through during the search.
+MIN_ESTIMATORS, MAX_ESTIMATORS = 20, 300
 
-# Logistic Regression
-lr = LogisticRegression(max_iter=500)
-lr.fit(x_train, y_train)
-y_pred = lr.predict(x_test)
-results.append(("Logistic Regression", accuracy_score(y_test, y_pred)))
-print("Logistic Regression:\n", classification_report(y_test, y_pred))
-
-# Decision Tree
-dt = DecisionTreeClassifier()
-dt.fit(x_train, y_train)
-y_pred = dt.predict(x_test)
-results.append(("Decision Tree", accuracy_score(y_test, y_pred)))
-print("Decision Tree:\n", classification_report(y_test, y_pred))
-
-# Random Forest
-rf = RandomForestClassifier()
-rf.fit(x_train, y_train)
-y_pred = rf.predict(x_test)
-results.append(("Random Forest", accuracy_score(y_test, y_pred)))
-print("Random Forest:\n", classification_report(y_test, y_pred))
-
-# Naive Bayes
-nb = GaussianNB()
-nb.fit(x_train.toarray(), y_train)  # needs dense input
-y_pred = nb.predict(x_test.toarray())
-results.append(("Naive Bayes", accuracy_score(y_test, y_pred)))
-print("Naive Bayes:\n", classification_report(y_test, y_pred))
-
-# SVM
-svc = SVC()
-svc.fit(x_train, y_train)
-y_pred = svc.predict(x_test)
-results.append(("SVM", accuracy_score(y_test, y_pred)))
-print("SVM:\n", classification_report(y_test, y_pred))
-
-# Gradient Boosting
-gbc = GradientBoostingClassifier()
-gbc.fit(x_train.toarray(), y_train)  # GBC may require dense input
-y_pred = gbc.predict(x_test.toarray())
-results.append(("Gradient Boosting", accuracy_score(y_test, y_pred)))
-print("Gradient Boosting:\n", classification_report(y_test, y_pred))
+results = []
+models = {}
+configs = {}
+started = time.monotonic()
+
+for name, estimator, needs_dense, grid, resource in MODELS:
+    # Naive Bayes and Gradient Boosting need dense input.
+    fit_X, eval_X = (dense("train", x_train), dense("test", x_test)) if needs_dense else (x_train, x_test)
+    within_budget = args.time_budget is None or time.monotonic() - started < args.time_budget
+
+    if args.search and within_budget:
+        limits = {"min_resources": MIN_ESTIMATORS, "max_resources": MAX_ESTIMATORS} if resource == "n_estimators" else {}
+        search = HalvingGridSearchCV(
+            estimator, grid, resource=resource, factor=3, cv=args.cv, scoring="accuracy",
+            n_jobs=-1, random_state=42, **limits
+        )
+        search_started = time.monotonic()
+        search.fit(fit_X, y_train)
+        model = search.best_estimator_
+        configs[name] = {
+            "search": "successive_halving",
+            "params": search.best_params_,
+            "cv_accuracy": float(search.best_score_),
+            "candidates": int(search.n_candidates_[0]),
+            "rounds": int(search.n_iterations_),
+        }
+        print(f"🔎 {name}: {search.n_candidates_[0]} configs over {search.n_iterations_} rounds "
+              f"({search.n_resources_[0]} -> {search.n_resources_[-1]} {resource}) in {time.monotonic() - search_started:.1f}s, "
+              f"best cv accuracy {search.best_score_:.4f} with {search.best_params_}")
+    else:
+        if args.search:
+            print(f"⏱️ Time budget spent; training {name} with default hyperparameters")
+        model = clone(estimator).fit(fit_X, y_train)
+        configs[name] = {"search": "defaults", "params": {}}
+
+    y_pred = model.predict(eval_X)
+    results.append((name, accuracy_score(y_test, y_pred)))
+    models[name] = model
+    print(f"{name}:\n", classification_report(y_test, y_pred))
 
 # -----------------------------
 # STEP 5: Pick Best Model
@@ -103,15 +204,36 @@ print("\nModel Comparison:\n", results_df)
 best_model_name, best_acc = max(results, key=lambda x: x[1])
 print(f"\nBest Model: {best_model_name} with accuracy {best_acc:.4f}")
 
-# Save the best model
-best_model = {
-    "Logistic Regression": lr,
-    "Decision Tree": dt,
-    "Random Forest": rf,
-    "Naive Bayes": nb,
-    "SVM": svc,
-    "Gradient Boosting": gbc
-}[best_model_name]
+# Save the best model, with the configuration that produced it
+best_model = models[best_model_name]
+best_config = dict(configs[best_model_name], model=best_model_name, test_accuracy=float(best_acc))
+best_model.training_config_ = best_config
+print(f"⚙️ Configuration: {best_config}")
 
 pickle.dump(best_model, open("internshipmodel.pkl", "wb"))
 print("✅ Model saved as internshipmodel.pkl")
+
+# -----------------------------
+# STEP 6: Export NumPy Runtime
+# -----------------------------
+# The app serves this export when it exists: same predictions, but loading it
+# needs only NumPy (no unpickling, no scikit-learn). An export from an earlier
+# run is removed first, so it can never shadow the pickle saved above.
+if os.path.exists(RUNTIME_PATH):
+    os.remove(RUNTIME_PATH)
+try:
+    kind = export_model(best_model, vectorizer, RUNTIME_PATH, config=best_config)
+except ValueError as e:
+    print(f"⚠️ {e}")
+else:
+    runtime_vectorizer, runtime_model = load_runtime(RUNTIME_PATH)
+    texts = features["texts"]
+    X_all = vectorizer.transform(texts)
+    # Naive Bayes and Gradient Boosting were trained on dense input.
+    expected = best_model.predict(X_all.toarray() if best_model_name in ("Naive Bayes", "Gradient Boosting") else X_all)
+    X_runtime = runtime_vectorizer.transform(texts)
+    if np.array_equal(X_runtime, X_all.toarray()) and (runtime_model.predict(X_runtime) == expected).all():
+        print(f"✅ {kind} runtime saved as {RUNTIME_PATH} (predictions match on all {len(texts)} rows)")
+    else:
+        print(f"⚠️ {RUNTIME_PATH} does not reproduce the model's predictions; the app will serve the pickle")
+        os.remove(RUNTIME_PATH)